@@ -1,10 +1,16 @@
 import json
 import logging
 import math
+import os
 import time
 import uuid
 from pathlib import Path
-from typing import Any, Callable, Dict, Iterable, List, Optional
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+import numpy as np
+
+from . import store as eval_store
+from .scoring import score_records
 
 logger = logging.getLogger(__name__)
 
@@ -26,19 +32,6 @@ PROMPT_VARIANTS = [
     },
 ]
 
-REFUSAL_PHRASES = [
-    "i cannot",
-    "i can't",
-    "unable to",
-    "i couldn’t",
-    "i couldn't",
-    "no results",
-    "not found in the documents",
-    "could not find",
-    "cannot find",
-    "i do not have",
-]
-
 
 def _nearest_rank(values: List[int], percentile: float) -> int:
     if not values:
@@ -55,24 +48,28 @@ def _apply_prompt(prompt_prefix: str, question: str) -> str:
     return f"{prefix}\n\nQuestion: {question}"
 
 
-def _is_refusal(answer: str) -> bool:
-    text = (answer or "").lower()
-    return any(phrase in text for phrase in REFUSAL_PHRASES)
-
-
-def _is_hallucination(answer: str, citations: Iterable[Any]) -> bool:
-    has_citations = bool(list(citations))
-    if _is_refusal(answer):
-        return False
-    return not has_citations
-
-
 def _rate(count: int, total: int) -> float:
     if total <= 0:
         return 0.0
     return count / total
 
 
+def _summarize(scores: Dict[str, np.ndarray], latencies: List[int], idx: np.ndarray) -> Dict[str, Any]:
+    total = len(idx)
+    grounding = scores["grounding_score"][idx]
+    grounded = grounding[~np.isnan(grounding)]
+    return {
+        "total_cases": total,
+        "citation_coverage_rate": round(_rate(int(scores["coverage"][idx].sum()), total), 4),
+        "refusal_rate": round(_rate(int(scores["refusal"][idx].sum()), total), 4),
+        "hallucination_rate": round(_rate(int(scores["hallucination"][idx].sum()), total), 4),
+        "grounding_score_mean": round(float(grounded.mean()), 4) if grounded.size else None,
+        "low_grounding_rate": round(_rate(int(scores["low_grounding"][idx].sum()), total), 4),
+        "latency_p50_ms": _nearest_rank([latencies[i] for i in idx], 0.50),
+        "latency_p95_ms": _nearest_rank([latencies[i] for i in idx], 0.95),
+    }
+
+
 def run_regression_eval(
     query_fn: Callable[[str, int], Dict[str, Any]],
     dataset: Optional[List[Dict[str, Any]]] = None,
@@ -80,6 +77,7 @@ def run_regression_eval(
     top_k: int = 3,
     run_id: Optional[str] = None,
     artifact_dir: Optional[Path] = None,
+    db_path: Optional[Path] = None,
 ) -> Dict[str, Any]:
     run_id = run_id or uuid.uuid4().hex
     dataset = dataset or DEFAULT_DATASET
@@ -99,17 +97,17 @@ def run_regression_eval(
         output_path,
     )
 
-    variant_metrics: Dict[str, Dict[str, Any]] = {}
-    overall_latencies: List[int] = []
-    overall_counts = {"coverage": 0, "refusal": 0, "hallucination": 0}
-    total_cases = 0
+    rows: List[Dict[str, Any]] = []
+    answers: List[str] = []
+    citation_lists: List[List[Any]] = []
+    latencies: List[int] = []
 
+    # Raw records are streamed as responses arrive, so a run that fails partway
+    # still leaves an (unscored) artifact behind.
     with output_path.open("w", encoding="utf-8") as handle:
         for variant in variants:
             name = variant["name"]
             prompt_prefix = variant.get("prompt_prefix", "")
-            latencies: List[int] = []
-            counts = {"coverage": 0, "refusal": 0, "hallucination": 0}
 
             logger.info("Evaluating variant=%s", name)
             for case in dataset:
@@ -117,25 +115,9 @@ def run_regression_eval(
                 prompted_question = _apply_prompt(prompt_prefix, question)
                 response = query_fn(prompted_question, top_k)
                 answer = response.get("answer", "")
-                citations = response.get("citations", [])
+                citations = response.get("citations", []) or []
                 latency_ms = int(response.get("latency_ms") or 0)
-
-                coverage = bool(citations)
-                refusal = _is_refusal(answer)
-                hallucination = _is_hallucination(answer, citations)
-
-                counts["coverage"] += int(coverage)
-                counts["refusal"] += int(refusal)
-                counts["hallucination"] += int(hallucination)
-                latencies.append(latency_ms)
-                overall_latencies.append(latency_ms)
-
-                total_cases += 1
-                overall_counts["coverage"] += int(coverage)
-                overall_counts["refusal"] += int(refusal)
-                overall_counts["hallucination"] += int(hallucination)
-
-                record = {
+                row = {
                     "run_id": run_id,
                     "variant": name,
                     "question_id": case.get("id"),
@@ -143,37 +125,71 @@ def run_regression_eval(
                     "prompted_question": prompted_question,
                     "answer": answer,
                     "num_citations": len(citations),
-                    "citation_coverage": coverage,
-                    "refusal": refusal,
-                    "hallucination": hallucination,
                     "latency_ms": latency_ms,
                     "timestamp": created_at,
                 }
-                handle.write(json.dumps(record) + "\n")
-
-            variant_metrics[name] = {
-                "total_cases": len(dataset),
-                "citation_coverage_rate": round(_rate(counts["coverage"], len(dataset)), 4),
-                "refusal_rate": round(_rate(counts["refusal"], len(dataset)), 4),
-                "hallucination_rate": round(_rate(counts["hallucination"], len(dataset)), 4),
-                "latency_p50_ms": _nearest_rank(latencies, 0.50),
-                "latency_p95_ms": _nearest_rank(latencies, 0.95),
+                handle.write(json.dumps(row) + "\n")
+                handle.flush()
+                rows.append(row)
+                answers.append(answer)
+                citation_lists.append(citations)
+                latencies.append(latency_ms)
+
+    # Score every answer of the run in one vectorized pass, then swap the scored
+    # records in over the raw artifact.
+    scores = score_records(answers, citation_lists)
+
+    def _scored_records() -> Iterator[Dict[str, Any]]:
+        # Built on demand from rows and scores rather than kept as another copy of the run.
+        for i, row in enumerate(rows):
+            grounding = scores["grounding_score"][i]
+            yield {
+                "run_id": run_id,
+                "variant": row["variant"],
+                "question_id": row["question_id"],
+                "question": row["question"],
+                "prompted_question": row["prompted_question"],
+                "answer": row["answer"],
+                "num_citations": row["num_citations"],
+                "citation_coverage": bool(scores["coverage"][i]),
+                "refusal": bool(scores["refusal"][i]),
+                "hallucination": bool(scores["hallucination"][i]),
+                "grounding_score": None if np.isnan(grounding) else round(float(grounding), 4),
+                "latency_ms": row["latency_ms"],
+                "timestamp": created_at,
             }
 
+    tmp_path = output_path.with_name(output_path.name + ".tmp")
+    with tmp_path.open("w", encoding="utf-8") as handle:
+        for record in _scored_records():
+            handle.write(json.dumps(record) + "\n")
+    os.replace(tmp_path, output_path)
+
+    variant_names = np.array([row["variant"] for row in rows], dtype=object)
+    variant_metrics: Dict[str, Dict[str, Any]] = {}
+    for variant in variants:
+        name = variant["name"]
+        variant_metrics[name] = _summarize(scores, latencies, np.flatnonzero(variant_names == name))
+
     summary = {
         "run_id": run_id,
         "created_at": created_at,
         "output_file": str(output_path),
         "variants": variant_metrics,
-        "overall": {
-            "total_cases": total_cases,
-            "citation_coverage_rate": round(_rate(overall_counts["coverage"], total_cases), 4),
-            "refusal_rate": round(_rate(overall_counts["refusal"], total_cases), 4),
-            "hallucination_rate": round(_rate(overall_counts["hallucination"], total_cases), 4),
-            "latency_p50_ms": _nearest_rank(overall_latencies, 0.50),
-            "latency_p95_ms": _nearest_rank(overall_latencies, 0.95),
-        },
+        "overall": _summarize(scores, latencies, np.arange(len(rows))),
     }
 
+    try:
+        eval_store.write_run(
+            run_id,
+            _scored_records(),
+            summary=summary,
+            source="regression",
+            created_at=created_at,
+            db_path=db_path or eval_store.default_db_path(artifact_dir),
+        )
+    except Exception:
+        logger.exception("Failed to write run_id=%s to eval store", run_id)
+
     logger.info("Completed regression eval run_id=%s", run_id)
     return summary
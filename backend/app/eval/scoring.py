@@ -0,0 +1,116 @@
+"""Vectorized scoring for eval records.
+
+All answers of a run are scored in one pass: refusals with a single compiled
+matcher, and grounding as the share of an answer's content tokens that also
+appear in the snippets it cites. Token overlap is computed with NumPy on
+integer token ids rather than per-record set logic.
+"""
+import re
+from typing import Any, Dict, Iterable, List, Sequence
+
+import numpy as np
+
+REFUSAL_PHRASES = [
+    "i cannot",
+    "i can't",
+    "unable to",
+    "i couldn’t",
+    "i couldn't",
+    "no results",
+    "not found in the documents",
+    "could not find",
+    "cannot find",
+    "i do not have",
+]
+REFUSAL_RE = re.compile("|".join(re.escape(p) for p in REFUSAL_PHRASES))
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+STOPWORDS = frozenset(
+    """
+    a an and are as at be by can do does for from has have how i in is it its
+    of on or our that the this to was we what when where which who will with
+    you your
+    """.split()
+)
+# Cited, non-refusal answers below this grounding score count as low-grounding.
+GROUNDING_THRESHOLD = 0.5
+
+
+def refusal_mask(answers: Sequence[str]) -> np.ndarray:
+    return np.fromiter(
+        (REFUSAL_RE.search((a or "").lower()) is not None for a in answers),
+        dtype=bool,
+        count=len(answers),
+    )
+
+
+def grounding_scores(answers: Sequence[str], snippets: Sequence[str]) -> np.ndarray:
+    """Fraction of each answer's distinct content tokens found in its snippets.
+
+    NaN where there is no snippet text to check against or the answer has no
+    content tokens.
+    """
+    n = len(answers)
+    vocab: Dict[str, int] = {}
+
+    def _token_ids(text: str) -> List[int]:
+        # Dedupe and drop stopwords with C-level set ops before touching the vocab.
+        tokens = set(TOKEN_RE.findall(text.lower()))
+        tokens -= STOPWORDS
+        return [vocab[t] if t in vocab else vocab.setdefault(t, len(vocab)) for t in tokens]
+
+    answer_rec: List[int] = []
+    answer_tok: List[int] = []
+    snippet_rec: List[int] = []
+    snippet_tok: List[int] = []
+    has_snippets = np.zeros(n, dtype=bool)
+    for i, (answer, snippet) in enumerate(zip(answers, snippets)):
+        if not snippet:
+            continue
+        has_snippets[i] = True
+        ids = _token_ids(answer or "")
+        answer_tok.extend(ids)
+        answer_rec.extend([i] * len(ids))
+        ids = _token_ids(snippet)
+        snippet_tok.extend(ids)
+        snippet_rec.extend([i] * len(ids))
+
+    # Encode (record, token) pairs as single int64 keys so one isin() call
+    # checks every answer token against its own record's snippets.
+    width = len(vocab) + 1
+    a_rec = np.asarray(answer_rec, dtype=np.int64)
+    a_keys = a_rec * width + np.asarray(answer_tok, dtype=np.int64)
+    s_keys = np.asarray(snippet_rec, dtype=np.int64) * width + np.asarray(snippet_tok, dtype=np.int64)
+    supported = np.bincount(a_rec[np.isin(a_keys, s_keys)], minlength=n)
+    total = np.bincount(a_rec, minlength=n)
+
+    scores = np.full(n, np.nan)
+    valid = has_snippets & (total > 0)
+    scores[valid] = supported[valid] / total[valid]
+    return scores
+
+
+def _snippet_text(citations: Iterable[Any]) -> str:
+    return " ".join(c.get("snippet") or "" for c in citations if isinstance(c, dict)).strip()
+
+
+def score_records(answers: Sequence[str], citations: Sequence[Sequence[Any]]) -> Dict[str, np.ndarray]:
+    """Score a whole run at once.
+
+    Returns boolean arrays `coverage`, `refusal`, `hallucination` and
+    `low_grounding`, plus float `grounding_score` (NaN when not computable).
+    Hallucination keeps its original definition (a non-refusal answer without
+    citations); grounding is reported alongside it.
+    """
+    coverage = np.fromiter((bool(c) for c in citations), dtype=bool, count=len(citations))
+    refusal = refusal_mask(answers)
+    grounding = grounding_scores(answers, [_snippet_text(c or []) for c in citations])
+    with np.errstate(invalid="ignore"):
+        low_grounding = coverage & ~refusal & (grounding < GROUNDING_THRESHOLD)
+    return {
+        "coverage": coverage,
+        "refusal": refusal,
+        "hallucination": ~refusal & ~coverage,
+        "grounding_score": grounding,
+        "low_grounding": low_grounding,
+    }
@@ -0,0 +1,420 @@
+"""Embedded SQLite store for eval results with indexed cross-run comparison.
+
+Every eval record is one row keyed by (run_id, variant, question_id), so
+comparing two runs is an indexed join instead of re-reading JSONL artifacts.
+Records without a question id are keyed by a hash of the question text (or
+their position in the run when there is no question either), so re-imports
+replace rather than duplicate them and they still join across runs.
+
+Import historical artifacts from the command line:
+
+    python -m backend.app.eval.store artifacts/eval_runs/*.jsonl runs/eval_*.json
+"""
+import argparse
+import hashlib
+import json
+import logging
+import math
+import os
+import re
+import sqlite3
+import time
+from contextlib import closing
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DB_FILENAME = "eval_results.sqlite"
+INSERT_BATCH_SIZE = 1000
+METRICS = ("citation_coverage", "refusal", "hallucination")
+# e.g. runs/eval_20260125_004406.json
+_FILENAME_TIMESTAMP_RE = re.compile(r"(\d{8})_(\d{6})")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    source TEXT NOT NULL,
+    created_at TEXT,
+    summary TEXT
+);
+CREATE TABLE IF NOT EXISTS results (
+    run_id TEXT NOT NULL,
+    variant TEXT NOT NULL,
+    question_id TEXT NOT NULL,
+    question TEXT,
+    answer TEXT,
+    num_citations INTEGER,
+    citation_coverage INTEGER,
+    refusal INTEGER,
+    hallucination INTEGER,
+    grounding_score REAL,
+    latency_ms INTEGER,
+    timestamp TEXT
+);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_results_run_variant_question
+    ON results (run_id, variant, question_id);
+CREATE INDEX IF NOT EXISTS idx_results_variant_question
+    ON results (variant, question_id);
+CREATE INDEX IF NOT EXISTS idx_results_run_variant_latency
+    ON results (run_id, variant, latency_ms);
+"""
+
+_RESULT_COLUMNS = (
+    "run_id",
+    "variant",
+    "question_id",
+    "question",
+    "answer",
+    "num_citations",
+    "citation_coverage",
+    "refusal",
+    "hallucination",
+    "grounding_score",
+    "latency_ms",
+    "timestamp",
+)
+_INSERT_RESULT = (
+    f"INSERT OR REPLACE INTO results ({', '.join(_RESULT_COLUMNS)}) "
+    f"VALUES ({', '.join('?' for _ in _RESULT_COLUMNS)})"
+)
+
+
+def default_db_path(artifact_dir: Optional[Path] = None) -> Path:
+    """EVAL_DB_PATH if set, else a database alongside the eval artifacts."""
+    env = os.getenv("EVAL_DB_PATH")
+    if env:
+        return Path(env)
+    if artifact_dir is None:
+        artifact_dir = Path(__file__).resolve().parents[3] / "artifacts" / "eval_runs"
+    return Path(artifact_dir) / DB_FILENAME
+
+
+def connect(db_path: Optional[Path] = None) -> sqlite3.Connection:
+    db_path = Path(db_path or default_db_path())
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(db_path), timeout=30)
+    conn.row_factory = sqlite3.Row
+    # WAL lets /eval/compare read while a run is being written.
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(_SCHEMA)
+    return conn
+
+
+def _question_key(question: Optional[str], ordinal: int) -> str:
+    """Deterministic stand-in for a missing question id."""
+    if question:
+        return "q_" + hashlib.sha1(question.encode("utf-8")).hexdigest()[:16]
+    return f"row_{ordinal}"
+
+
+def _optional_bool(value: Any) -> Optional[int]:
+    return None if value is None else int(bool(value))
+
+
+def _row(record: Dict[str, Any], run_id: str, ordinal: int) -> tuple:
+    question_id = record.get("question_id")
+    if question_id is None:
+        question_id = _question_key(record.get("question"), ordinal)
+    num_citations = record.get("num_citations")
+    coverage = record.get("citation_coverage")
+    if coverage is None and num_citations is not None:
+        coverage = int(num_citations) > 0
+    return (
+        record.get("run_id") or run_id,
+        record.get("variant") or "default",
+        str(question_id),
+        record.get("question"),
+        record.get("answer"),
+        num_citations,
+        _optional_bool(coverage),
+        _optional_bool(record.get("refusal")),
+        _optional_bool(record.get("hallucination")),
+        record.get("grounding_score"),
+        int(record.get("latency_ms") or 0),
+        record.get("timestamp"),
+    )
+
+
+def _insert_batched(conn: sqlite3.Connection, rows: Iterable[tuple]) -> int:
+    total = 0
+    batch: List[tuple] = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= INSERT_BATCH_SIZE:
+            conn.executemany(_INSERT_RESULT, batch)
+            total += len(batch)
+            batch = []
+    if batch:
+        conn.executemany(_INSERT_RESULT, batch)
+        total += len(batch)
+    return total
+
+
+def write_run(
+    run_id: str,
+    records: Iterable[Dict[str, Any]],
+    summary: Optional[Dict[str, Any]] = None,
+    source: str = "regression",
+    created_at: Optional[str] = None,
+    db_path: Optional[Path] = None,
+) -> int:
+    """Insert (or replace) one run and its records in a single transaction."""
+    created_at = created_at or time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+    with closing(connect(db_path)) as conn, conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO runs (run_id, source, created_at, summary) VALUES (?, ?, ?, ?)",
+            (run_id, source, created_at, json.dumps(summary) if summary is not None else None),
+        )
+        count = _insert_batched(conn, (_row(r, run_id, i) for i, r in enumerate(records)))
+    logger.info("Stored eval run_id=%s source=%s records=%s", run_id, source, count)
+    return count
+
+
+def _iter_artifact(path: Path) -> Iterator[Dict[str, Any]]:
+    if path.suffix == ".jsonl":
+        with path.open("r", encoding="utf-8-sig") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        return
+
+    # runs/eval_*.json: a saved /eval/run response, one run per file.
+    with path.open("r", encoding="utf-8-sig") as f:
+        blob = json.load(f)
+    for result in blob.get("results", []):
+        yield {
+            "run_id": blob.get("run_id") or path.stem,
+            "variant": "eval_run",
+            "question_id": result.get("id"),
+            **result,
+        }
+
+
+def _artifact_created_at(path: Path) -> str:
+    """Fallback run time for artifacts whose records carry no timestamp."""
+    match = _FILENAME_TIMESTAMP_RE.search(path.stem)
+    if match:
+        try:
+            parsed = time.strptime(match.group(1) + match.group(2), "%Y%m%d%H%M%S")
+            return time.strftime("%Y-%m-%dT%H:%M:%SZ", parsed)
+        except ValueError:
+            pass
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(path.stat().st_mtime))
+
+
+def import_artifact(path: Path, db_path: Optional[Path] = None) -> Dict[str, int]:
+    """Import a historical `regression_*.jsonl` or `eval_*.json` file.
+
+    Re-importing the same file is idempotent. Returns record counts per run_id.
+    """
+    path = Path(path)
+    counts: Dict[str, int] = {}
+
+    def _rows() -> Iterator[tuple]:
+        for i, record in enumerate(_iter_artifact(path)):
+            row = _row(record, path.stem, i)
+            counts[row[0]] = counts.get(row[0], 0) + 1
+            yield row
+
+    fallback_created_at = _artifact_created_at(path)
+    with closing(connect(db_path)) as conn, conn:
+        _insert_batched(conn, _rows())
+        for run_id in counts:
+            conn.execute(
+                "INSERT OR IGNORE INTO runs (run_id, source, created_at) "
+                "SELECT ?, 'import', COALESCE(MIN(timestamp), ?) FROM results WHERE run_id = ?",
+                (run_id, fallback_created_at, run_id),
+            )
+    logger.info("Imported %s into eval store runs=%s", path, counts)
+    return counts
+
+
+def list_runs(limit: int = 100, db_path: Optional[Path] = None) -> List[Dict[str, Any]]:
+    with closing(connect(db_path)) as conn:
+        rows = conn.execute(
+            "SELECT run_id, source, created_at FROM runs ORDER BY created_at DESC LIMIT ?",
+            (limit,),
+        ).fetchall()
+    return [dict(r) for r in rows]
+
+
+def get_run(run_id: str, db_path: Optional[Path] = None) -> Optional[Dict[str, Any]]:
+    with closing(connect(db_path)) as conn:
+        row = conn.execute(
+            "SELECT run_id, source, created_at, summary FROM runs WHERE run_id = ?",
+            (run_id,),
+        ).fetchone()
+    if row is None:
+        return None
+    run = dict(row)
+    run["summary"] = json.loads(run["summary"]) if run["summary"] else None
+    return run
+
+
+def _delta(base: Optional[float], candidate: Optional[float]) -> Optional[float]:
+    if base is None or candidate is None:
+        return None
+    return round(candidate - base, 4)
+
+
+def _variant_summary(conn: sqlite3.Connection, run_id: str) -> Dict[str, Dict[str, Any]]:
+    summary: Dict[str, Dict[str, Any]] = {}
+    totals: Dict[str, int] = {}
+    rows = conn.execute(
+        "SELECT variant, COUNT(*) AS total, "
+        + ", ".join(f"SUM({m}) AS {m}, COUNT({m}) AS {m}_n" for m in METRICS)
+        + ", AVG(grounding_score) AS grounding_score_mean"
+        + " FROM results WHERE run_id = ? GROUP BY variant",
+        (run_id,),
+    ).fetchall()
+    for r in rows:
+        totals[r["variant"]] = r["total"]
+        summary[r["variant"]] = {
+            "total_cases": r["total"],
+            **{
+                f"{m}_rate": round((r[m] or 0) / r[f"{m}_n"], 4) if r[f"{m}_n"] else None
+                for m in METRICS
+            },
+            "grounding_score_mean": (
+                round(r["grounding_score_mean"], 4) if r["grounding_score_mean"] is not None else None
+            ),
+        }
+
+    for variant, total in totals.items():
+        for label, percentile in (("latency_p50_ms", 0.50), ("latency_p95_ms", 0.95)):
+            summary[variant][label] = _nearest_rank_latency(conn, run_id, variant, total, percentile)
+    return summary
+
+
+def _nearest_rank_latency(
+    conn: sqlite3.Connection, run_id: str, variant: Optional[str], total: int, percentile: float
+) -> int:
+    # Same nearest-rank definition as the regression summary, served by the
+    # (run_id, variant, latency_ms) index instead of sorting in Python.
+    rank = max(1, math.ceil(percentile * total))
+    if variant is None:
+        sql = "SELECT latency_ms FROM results WHERE run_id = ? ORDER BY latency_ms LIMIT 1 OFFSET ?"
+        params: tuple = (run_id, rank - 1)
+    else:
+        sql = (
+            "SELECT latency_ms FROM results WHERE run_id = ? AND variant = ? "
+            "ORDER BY latency_ms LIMIT 1 OFFSET ?"
+        )
+        params = (run_id, variant, rank - 1)
+    row = conn.execute(sql, params).fetchone()
+    return row[0] if row else 0
+
+
+def run_metrics(limit: int = 50, db_path: Optional[Path] = None) -> List[Dict[str, Any]]:
+    """Headline metrics for the most recent runs, newest first."""
+    with closing(connect(db_path)) as conn:
+        runs = conn.execute(
+            "SELECT run_id, source, created_at FROM runs ORDER BY created_at DESC LIMIT ?",
+            (limit,),
+        ).fetchall()
+        out: List[Dict[str, Any]] = []
+        for run in runs:
+            r = conn.execute(
+                "SELECT COUNT(*) AS total, AVG(citation_coverage) AS coverage, AVG(refusal) AS refusal, "
+                "AVG(hallucination) AS hallucination, AVG(grounding_score) AS grounding "
+                "FROM results WHERE run_id = ?",
+                (run["run_id"],),
+            ).fetchone()
+            total = r["total"]
+            entry = dict(run)
+            entry.update(
+                {
+                    "total_cases": total,
+                    "citation_coverage_rate": r["coverage"],
+                    "refusal_rate": r["refusal"],
+                    "hallucination_rate": r["hallucination"],
+                    "grounding_score_mean": r["grounding"],
+                }
+            )
+            for label, percentile in (("p50", 0.50), ("p95", 0.95), ("p99", 0.99)):
+                entry[f"latency_{label}_ms"] = (
+                    _nearest_rank_latency(conn, run["run_id"], None, total, percentile) if total else None
+                )
+            out.append(entry)
+    return out
+
+
+def compare_runs(
+    base_run_id: str,
+    candidate_run_id: str,
+    db_path: Optional[Path] = None,
+) -> Dict[str, Any]:
+    """Per-question and per-variant metric deltas (candidate minus base)."""
+    with closing(connect(db_path)) as conn:
+        base_summary = _variant_summary(conn, base_run_id)
+        candidate_summary = _variant_summary(conn, candidate_run_id)
+
+        select_metrics = ", ".join(
+            f"b.{c} AS base_{c}, c.{c} AS candidate_{c}" for c in METRICS + ("grounding_score", "latency_ms")
+        )
+        rows = conn.execute(
+            f"SELECT b.variant, b.question_id, b.question, {select_metrics} "
+            "FROM results b JOIN results c "
+            "ON c.run_id = ? AND c.variant = b.variant AND c.question_id = b.question_id "
+            "WHERE b.run_id = ? ORDER BY b.variant, b.question_id",
+            (candidate_run_id, base_run_id),
+        ).fetchall()
+
+    questions: List[Dict[str, Any]] = []
+    for r in rows:
+        entry: Dict[str, Any] = {
+            "variant": r["variant"],
+            "question_id": r["question_id"],
+            "question": r["question"],
+            "latency_ms_delta": _delta(r["base_latency_ms"], r["candidate_latency_ms"]),
+            "grounding_score_delta": _delta(r["base_grounding_score"], r["candidate_grounding_score"]),
+        }
+        changed = []
+        for m in METRICS:
+            base, cand = r[f"base_{m}"], r[f"candidate_{m}"]
+            entry[m] = {"base": base, "candidate": cand}
+            if base is not None and cand is not None and base != cand:
+                changed.append(m)
+        entry["changed"] = changed
+        questions.append(entry)
+
+    variants: Dict[str, Dict[str, Any]] = {}
+    for name in sorted(set(base_summary) | set(candidate_summary)):
+        base = base_summary.get(name, {})
+        cand = candidate_summary.get(name, {})
+        variants[name] = {
+            "base": base or None,
+            "candidate": cand or None,
+            "deltas": {
+                key: _delta(base.get(key), cand.get(key))
+                for key in [f"{m}_rate" for m in METRICS]
+                + ["grounding_score_mean", "latency_p50_ms", "latency_p95_ms"]
+            },
+        }
+
+    return {
+        "base_run_id": base_run_id,
+        "candidate_run_id": candidate_run_id,
+        "variants": variants,
+        "questions": questions,
+        "num_compared": len(questions),
+        "num_changed": sum(1 for q in questions if q["changed"]),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Import eval artifacts into the SQLite store.")
+    parser.add_argument("paths", nargs="+", type=Path)
+    parser.add_argument("--db", type=Path, default=None)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    for path in args.paths:
+        counts = import_artifact(path, db_path=args.db)
+        print(f"{path}: {sum(counts.values())} records across {len(counts)} run(s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+"""Recursive, parallel reader for local ingest folders.
+
+Files are discovered with a single os.scandir walk, filtered by include and
+exclude globs, and read in a thread pool. Files above MMAP_THRESHOLD_BYTES are
+memory-mapped and chunked window by window, so a large file is never held in
+memory as one string. Files above MAX_FILE_BYTES are skipped.
+
+The pool parallelizes the many-small-files case. A file at or above the mmap
+threshold is only opened and mapped in the pool; it is decoded and chunked
+lazily on the consuming thread, since prefetching it in the pool would hold
+all of its chunks in memory at once.
+"""
+import codecs
+import fnmatch
+import logging
+import mmap
+import os
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INCLUDE = ("*.md", "*.txt")
+DEFAULT_EXCLUDE = (".git", "__pycache__", "node_modules")
+MAX_FILE_BYTES = int(os.getenv("INGEST_MAX_FILE_BYTES", str(256 * 1024 * 1024)))
+MMAP_THRESHOLD_BYTES = int(os.getenv("INGEST_MMAP_THRESHOLD_BYTES", str(8 * 1024 * 1024)))
+READ_WORKERS = int(os.getenv("INGEST_READ_WORKERS", str(min(32, (os.cpu_count() or 1) * 4))))
+MMAP_WINDOW_BYTES = 1 << 20
+_SNIFF_BYTES = 64 * 1024
+
+_BOMS = (
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+
+
+def _matches(rel_path: str, patterns: Sequence[str]) -> bool:
+    # Patterns with a slash match the path relative to the root; others match the name.
+    name = rel_path.rsplit("/", 1)[-1]
+    return any(fnmatch.fnmatch(rel_path if "/" in p else name, p) for p in patterns)
+
+
+def iter_local_files(
+    root: str,
+    include: Sequence[str] = DEFAULT_INCLUDE,
+    exclude: Sequence[str] = DEFAULT_EXCLUDE,
+) -> Iterator[str]:
+    """Yield paths of matching files under `root`, recursing into subdirectories."""
+    stack = [(root, "")]
+    while stack:
+        directory, rel_dir = stack.pop()
+        try:
+            entries = sorted(os.scandir(directory), key=lambda e: e.name)
+        except OSError as e:
+            logger.warning("Skipping unreadable directory %s: %s", directory, e)
+            continue
+        subdirs = []
+        for entry in entries:
+            rel = f"{rel_dir}{entry.name}"
+            if _matches(rel, exclude):
+                continue
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.append((entry.path, f"{rel}/"))
+                elif entry.is_file() and _matches(rel, include):
+                    yield entry.path
+            except OSError:
+                continue
+        # Reverse so the stack visits subdirectories in sorted order.
+        stack.extend(reversed(subdirs))
+
+
+def has_local_files(
+    root: str,
+    include: Sequence[str] = DEFAULT_INCLUDE,
+    exclude: Sequence[str] = DEFAULT_EXCLUDE,
+) -> bool:
+    return next(iter_local_files(root, include, exclude), None) is not None
+
+
+def _sniff_encoding(head: bytes) -> str:
+    for bom, encoding in _BOMS:
+        if head.startswith(bom):
+            return encoding
+    try:
+        # final=False tolerates a multi-byte sequence cut off at the sample boundary.
+        codecs.getincrementaldecoder("utf-8")().decode(head, final=False)
+        return "utf-8"
+    except UnicodeDecodeError:
+        return "cp1252"
+
+
+def decode_bytes(data: bytes) -> str:
+    """Decode file contents that may be UTF-8, UTF-16 (with BOM) or legacy cp1252."""
+    encoding = _sniff_encoding(data[:_SNIFF_BYTES])
+    try:
+        return data.decode(encoding)
+    except UnicodeDecodeError:
+        return data.decode(encoding, errors="replace")
+
+
+def iter_chunks(pieces: Iterable[str], max_chars: int = 1200) -> Iterator[str]:
+    """Stream fixed-size chunks from text pieces.
+
+    Produces the same chunks as chunking the concatenated text in one go.
+    """
+    buf = ""
+    started = False
+    for piece in pieces:
+        if not started:
+            piece = piece.lstrip()
+            started = bool(piece)
+        buf += piece
+        pos = 0
+        while len(buf) - pos >= max_chars:
+            chunk = buf[pos : pos + max_chars].strip()
+            if chunk:
+                yield chunk
+            pos += max_chars
+        buf = buf[pos:]
+    chunk = buf.strip()
+    if chunk:
+        yield chunk
+
+
+def chunk_text(text: str, max_chars: int = 1200) -> List[str]:
+    return list(iter_chunks([text or ""], max_chars))
+
+
+def _iter_mmap_text(mm: mmap.mmap) -> Iterator[str]:
+    with mm:
+        encoding = _sniff_encoding(mm[:_SNIFF_BYTES])
+        decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+        for offset in range(0, len(mm), MMAP_WINDOW_BYTES):
+            yield decoder.decode(mm[offset : offset + MMAP_WINDOW_BYTES])
+        yield decoder.decode(b"", final=True)
+
+
+def _read_document(path: str, root: str, max_chars: int) -> Optional[Dict[str, Any]]:
+    try:
+        size = os.path.getsize(path)
+    except OSError:
+        return None
+    if size > MAX_FILE_BYTES:
+        logger.warning("Skipping %s: %s bytes exceeds cap of %s", path, size, MAX_FILE_BYTES)
+        return None
+    if size == 0:
+        return None
+
+    doc_id = os.path.relpath(path, root).replace("\\", "/")
+    source = path.replace("\\", "/")
+    if size >= MMAP_THRESHOLD_BYTES:
+        # Opened and mapped here so a vanished or unmappable file is skipped like
+        # any other; decoded and chunked lazily on the consuming thread.
+        try:
+            with open(path, "rb") as f:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError) as e:
+            logger.warning("Skipping unreadable file %s: %s", path, e)
+            return None
+        return {"id": doc_id, "path": source, "chunks": iter_chunks(_iter_mmap_text(mm), max_chars)}
+
+    try:
+        with open(path, "rb") as f:
+            text = decode_bytes(f.read())
+    except OSError as e:
+        logger.warning("Skipping unreadable file %s: %s", path, e)
+        return None
+    chunks = chunk_text(text, max_chars)
+    if not chunks:
+        return None
+    return {"id": doc_id, "path": source, "chunks": chunks}
+
+
+def iter_documents(
+    root: str,
+    include: Sequence[str] = DEFAULT_INCLUDE,
+    exclude: Sequence[str] = DEFAULT_EXCLUDE,
+    max_chars: int = 1200,
+    workers: int = READ_WORKERS,
+) -> Iterator[Dict[str, Any]]:
+    """Yield `{"id", "path", "chunks"}` for each readable file, in walk order.
+
+    At most `workers * 4` files are in flight, so memory stays bounded no
+    matter how large the tree is.
+    """
+    paths = iter_local_files(root, include, exclude)
+    window = max(1, workers) * 4
+    pending: Deque[Future] = deque()
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="ingest-read") as pool:
+        for path in paths:
+            pending.append(pool.submit(_read_document, path, root, max_chars))
+            if len(pending) >= window:
+                doc = pending.popleft().result()
+                if doc:
+                    yield doc
+        while pending:
+            doc = pending.popleft().result()
+            if doc:
+                yield doc
@@ -1,16 +1,31 @@
-﻿from fastapi import FastAPI
+from fastapi import FastAPI
 from pydantic import BaseModel
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
 import os
-import glob
+import logging
+import time
+import uuid
 from pathlib import Path
 
+from .eval import store as eval_store
 from .guardrails import redact_pii, check_injection
-from .rag import COLLECTION_NAME, get_client, get_collection, query_rag
+from .local_reader import DEFAULT_EXCLUDE, DEFAULT_INCLUDE, chunk_text, has_local_files, iter_documents
+from .rag import (
+    COLLECTION_NAME,
+    acquire_collection,
+    build_numpy_index,
+    create_staging_collection,
+    get_active_collection_name,
+    get_client,
+    promote_collection,
+    query_rag,
+)
 from .routes.regression_eval import router as regression_router
 
 from urllib.parse import urlparse
 
+logger = logging.getLogger(__name__)
+
 try:
     from google.cloud import storage
 except Exception:
@@ -60,11 +75,26 @@ def iter_gcs_text_files(gcs_uri: str):
 PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # repo root
 DATA_DIR_DEFAULT = os.path.join(PROJECT_ROOT, "data", "sample_docs")
 
-def resolve_ingest_path(p: str) -> str:
-# FIXED: was invalid docstring ->     \"\"\"Resolve ingest folder robustly in Cloud Run/buildpacks.\"\"\"
+INGEST_BATCH_SIZE = 1000
+
+# Successful resolutions only, keyed on the globs they were probed with: a folder
+# that had no matching files yet is probed again next time.
+_resolved_ingest_paths: Dict[Tuple[str, Tuple[str, ...], Tuple[str, ...]], str] = {}
+
+
+def resolve_ingest_path(
+    p: str,
+    include: Sequence[str] = DEFAULT_INCLUDE,
+    exclude: Sequence[str] = DEFAULT_EXCLUDE,
+) -> str:
+    """Resolve ingest folder robustly in Cloud Run/buildpacks."""
     p = (p or "").strip()
     if not p:
         return DATA_DIR_DEFAULT
+    key = (p, tuple(include), tuple(exclude))
+    cached = _resolved_ingest_paths.get(key)
+    if cached is not None and os.path.isdir(cached):
+        return cached
 
     # Build candidate paths
     candidates = []
@@ -79,13 +109,12 @@ def resolve_ingest_path(p: str) -> str:
             os.path.join(PROJECT_ROOT, "app", p),
         ])
 
-    # Pick first directory that exists AND has .txt/.md
+    # Pick first directory that exists AND has files matching the globs
     for c in candidates:
         c = os.path.normpath(c)
-        if os.path.isdir(c):
-            has_files = bool(glob.glob(os.path.join(c, "*.txt"))) or bool(glob.glob(os.path.join(c, "*.md")))
-            if has_files:
-                return c
+        if os.path.isdir(c) and has_local_files(c, include, exclude):
+            _resolved_ingest_paths[key] = c
+            return c
 
     # If dirs exist but no files, return first existing dir (so error message is accurate)
     for c in candidates:
@@ -107,49 +136,16 @@ app.include_router(regression_router)
 # ----------------------------
 class IngestRequest(BaseModel):
     path: str = DATA_DIR_DEFAULT
+    include: List[str] = list(DEFAULT_INCLUDE)
+    exclude: List[str] = list(DEFAULT_EXCLUDE)
+    numpy_index: bool = True
+    numpy_index_dtype: Optional[str] = None
 
 
 class QueryRequest(BaseModel):
     question: str
     top_k: int = 3
-
-
-# ----------------------------
-# Helpers
-# ----------------------------
-def read_text_files(folder: str) -> List[Dict[str, str]]:
-    patterns = [
-        os.path.join(folder, "*.md"),
-        os.path.join(folder, "*.txt"),
-    ]
-    paths: List[str] = []
-    for p in patterns:
-        paths.extend(glob.glob(p))
-
-    docs: List[Dict[str, str]] = []
-    for path in paths:
-        try:
-            with open(DEFAULT_EVAL_SET, "r", encoding="utf-8-sig") as f:
-                eval_blob = json.load(f)
-            if text.strip():
-                docs.append({"path": path.replace("\\", "/"), "text": text})
-        except Exception:
-            continue
-    return docs
-
-
-def chunk_text(text: str, max_chars: int = 1200) -> List[str]:
-    t = (text or "").strip()
-    if not t:
-        return []
-    chunks: List[str] = []
-    i = 0
-    while i < len(t):
-        chunk = t[i : i + max_chars].strip()
-        if chunk:
-            chunks.append(chunk)
-        i += max_chars
-    return chunks
+    engine: Optional[str] = None
 
 
 # ----------------------------
@@ -163,42 +159,41 @@ def health() -> Dict[str, str]:
 @app.get("/stats")
 def stats() -> Dict[str, Any]:
     client = get_client()
-    collection = get_collection(client)
     try:
-        count = collection.count()
+        with acquire_collection(client) as collection:
+            count = collection.count()
     except Exception:
         count = 0
-    return {"status": "ok", "collection": COLLECTION_NAME, "count": count}
+    return {
+        "status": "ok",
+        "collection": COLLECTION_NAME,
+        "active_collection": get_active_collection_name(),
+        "count": count,
+    }
 
 
 @app.post("/ingest")
 def ingest(req: IngestRequest) -> Dict[str, Any]:
     # Load docs from local folder OR GCS (gs://bucket/prefix)
-    docs: List[Dict[str, str]] = []
-
     if req.path.startswith("gs://"):
         folder = req.path
         try:
-            for fname, text in iter_gcs_text_files(req.path):
-                docs.append({"path": fname, "text": text})
+            gcs_docs = [
+                {"id": fname, "path": fname, "chunks": chunk_text(text)}
+                for fname, text in iter_gcs_text_files(req.path)
+            ]
         except Exception as e:
             return {"status": "error", "message": f"GCS ingest failed: {e}"}
+        docs: Iterable[Dict[str, Any]] = gcs_docs
     else:
-        folder = resolve_ingest_path(req.path)
-        docs = read_text_files(folder)
-
-    if not docs:
-        return {"status": "error", "message": f"No .md or .txt files found in: {folder}"}
+        folder = resolve_ingest_path(req.path, req.include, req.exclude)
+        docs = iter_documents(folder, include=req.include, exclude=req.exclude)
 
     client = get_client()
 
-    # reset collection for deterministic demo runs
-    try:
-        client.delete_collection(COLLECTION_NAME)
-    except Exception:
-        pass
-
-    collection = get_collection(client)
+    # Build into a fresh staging collection; the live alias keeps serving queries
+    # until the new generation is validated and promoted.
+    staging = create_staging_collection(client)
 
     ids: List[str] = []
     metadatas: List[Dict[str, Any]] = []
@@ -207,17 +202,40 @@ def ingest(req: IngestRequest) -> Dict[str, Any]:
     doc_count = 0
     chunk_count = 0
 
-    for d in docs:
-        doc_count += 1
-        chunks = chunk_text(d["text"])
-        for i, c in enumerate(chunks):
-            chunk_id = f"{os.path.basename(d['path'])}::chunk_{i}"
-            ids.append(chunk_id)
-            documents.append(c)
-            metadatas.append({"source": d["path"], "chunk": i})
-            chunk_count += 1
+    try:
+        # Files are streamed from the reader and flushed to Chroma in batches,
+        # so memory is bounded by INGEST_BATCH_SIZE rather than the corpus size.
+        for d in docs:
+            doc_count += 1
+            for i, c in enumerate(d["chunks"]):
+                ids.append(f"{d['id']}::chunk_{i}")
+                documents.append(c)
+                metadatas.append({"source": d["path"], "chunk": i})
+                chunk_count += 1
+                if len(ids) >= INGEST_BATCH_SIZE:
+                    staging.add(ids=ids, documents=documents, metadatas=metadatas)
+                    ids, documents, metadatas = [], [], []
+        if ids:
+            staging.add(ids=ids, documents=documents, metadatas=metadatas)
+
+        if chunk_count:
+            if req.numpy_index:
+                build_numpy_index(staging, dtype=req.numpy_index_dtype)
+            active = promote_collection(client, staging, expected_count=chunk_count)
+    except Exception as e:
+        try:
+            client.delete_collection(staging.name)
+        except Exception:
+            pass
+        return {"status": "error", "message": f"Ingest failed, live collection unchanged: {e}"}
 
-    collection.add(ids=ids, documents=documents, metadatas=metadatas)
+    if not chunk_count:
+        try:
+            client.delete_collection(staging.name)
+        except Exception:
+            pass
+        patterns = "*.md, *.txt" if req.path.startswith("gs://") else ", ".join(req.include)
+        return {"status": "error", "message": f"No files matching {patterns} found in: {folder}"}
 
     return {
         "status": "ok",
@@ -225,12 +243,14 @@ def ingest(req: IngestRequest) -> Dict[str, Any]:
         "documents": doc_count,
         "chunks": chunk_count,
         "collection": COLLECTION_NAME,
+        "active_collection": active,
+        "numpy_index": req.numpy_index,
     }
 
 
 @app.post("/query")
 def query(req: QueryRequest) -> Dict[str, Any]:
-    return query_rag(req.question, top_k=req.top_k)
+    return query_rag(req.question, top_k=req.top_k, engine=req.engine)
 
 
 
@@ -244,7 +264,7 @@ def query_guarded(req: QueryRequest) -> Dict[str, Any]:
     # Redact PII before retrieval
     safe_q = redact_pii(req.question)
 
-    return query_rag(safe_q, top_k=req.top_k)
+    return query_rag(safe_q, top_k=req.top_k, engine=req.engine)
 
 @app.post("/eval/run")
 def eval_run() -> Dict[str, Any]:
@@ -268,6 +288,8 @@ def eval_run() -> Dict[str, Any]:
             {"id": "support_1", "question": "What are the support hours?"},
         ]
 
+    run_id = uuid.uuid4().hex
+    created_at = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
     results_out: List[Dict[str, Any]] = []
     questions_with_citations = 0
     total_latency = 0
@@ -296,8 +318,22 @@ def eval_run() -> Dict[str, Any]:
     hit_rate_pct = (questions_with_citations / total_questions * 100.0) if total_questions else 0.0
     avg_latency_ms = (total_latency / total_questions) if total_questions else 0.0
 
+    try:
+        eval_store.write_run(
+            run_id,
+            (
+                {"variant": "eval_run", "question_id": r["id"], "timestamp": created_at, **r}
+                for r in results_out
+            ),
+            source="eval_run",
+            created_at=created_at,
+        )
+    except Exception:
+        logger.exception("Failed to write run_id=%s to eval store", run_id)
+
     return {
         "status": "ok",
+        "run_id": run_id,
         "results": results_out,
         "stats": {
             "total_questions": total_questions,
@@ -1,12 +1,43 @@
+import json
+import logging
 import os
+import threading
 import time
-from typing import Any, Dict, List
+import uuid
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
 
 import chromadb
 from chromadb.config import Settings
 
+from . import vector_index
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+logger = logging.getLogger(__name__)
+
 CHROMA_DIR = os.getenv("CHROMA_DIR", "/tmp/chroma")
 COLLECTION_NAME = "docs"
+ALIAS_FILE = "active_collection.json"
+ALIAS_LOCK_FILE = "active_collection.lock"
+RETRIEVAL_ENGINES = ("chroma", "numpy")
+RETRIEVAL_ENGINE = os.getenv("RETRIEVAL_ENGINE", "chroma")
+NUMPY_INDEX_DTYPE = os.getenv("NUMPY_INDEX_DTYPE", vector_index.DEFAULT_DTYPE)
+NUMPY_INDEX_EXPORT_BATCH = 1000
+
+# In-process reader bookkeeping for blue/green swaps. The counts only cover this
+# process, so a replaced generation is kept as `previous` until the next promote
+# (giving other workers' in-flight queries a full ingest cycle to finish) and is
+# then dropped once the last local query against it finishes.
+_readers_lock = threading.Lock()
+_readers: Dict[str, int] = {}
+_retired: Set[str] = set()
+_alias_cache: Dict[str, Tuple[Tuple[int, int, int], str]] = {}
+_embedding_function: Any = None
 
 
 def get_client() -> chromadb.PersistentClient:
@@ -17,8 +48,239 @@ def get_client() -> chromadb.PersistentClient:
     )
 
 
-def get_collection(client: chromadb.PersistentClient):
-    return client.get_or_create_collection(name=COLLECTION_NAME)
+def _alias_path() -> str:
+    return os.path.join(CHROMA_DIR, ALIAS_FILE)
+
+
+def _read_alias() -> Dict[str, Any]:
+    try:
+        with open(_alias_path(), "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def get_active_collection_name() -> str:
+    """Resolve the `docs` alias to the physical collection currently serving queries.
+
+    Falls back to COLLECTION_NAME when no alias has been published yet, so stores
+    created before blue/green ingest keep working.
+    """
+    path = _alias_path()
+    try:
+        st = os.stat(path)
+    except OSError:
+        return COLLECTION_NAME
+
+    key = (st.st_ino, st.st_mtime_ns, st.st_size)
+    cached = _alias_cache.get(path)
+    if cached and cached[0] == key:
+        return cached[1]
+
+    alias = _read_alias()
+    if not alias:
+        return COLLECTION_NAME
+    name = alias.get("collection") or COLLECTION_NAME
+
+    _alias_cache[path] = (key, name)
+    return name
+
+
+def _write_alias(name: str, previous: Optional[str]) -> None:
+    os.makedirs(CHROMA_DIR, exist_ok=True)
+    path = _alias_path()
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(
+            {"collection": name, "previous": previous, "alias": COLLECTION_NAME, "updated_at": time.time()},
+            f,
+        )
+        f.flush()
+        os.fsync(f.fileno())
+    # os.replace is atomic on POSIX and Windows, so readers see either the old or new pointer.
+    os.replace(tmp_path, path)
+
+
+@contextmanager
+def _alias_update_lock() -> Iterator[None]:
+    """Serialize alias read-modify-write across worker processes."""
+    os.makedirs(CHROMA_DIR, exist_ok=True)
+    with open(os.path.join(CHROMA_DIR, ALIAS_LOCK_FILE), "a+b") as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def get_collection(client: chromadb.PersistentClient, name: Optional[str] = None):
+    """Open a collection generation; raises if it does not exist.
+
+    Only the legacy `docs` fallback is created on demand. A generation name that
+    no longer exists must not be silently recreated as an empty collection.
+    """
+    name = name or get_active_collection_name()
+    if name == COLLECTION_NAME:
+        return client.get_or_create_collection(name=name)
+    return client.get_collection(name=name)
+
+
+def _collection_exists(client: chromadb.PersistentClient, name: str) -> bool:
+    try:
+        client.get_collection(name=name)
+    except Exception:
+        return False
+    return True
+
+
+def get_embedding_function() -> Any:
+    """Chroma's default embedder, used to embed queries for the numpy engine."""
+    global _embedding_function
+    if _embedding_function is None:
+        from chromadb.utils.embedding_functions import DefaultEmbeddingFunction
+
+        _embedding_function = DefaultEmbeddingFunction()
+    return _embedding_function
+
+
+@contextmanager
+def acquire_collection(client: chromadb.PersistentClient) -> Iterator[Any]:
+    """Pin the active collection for the duration of a read.
+
+    If the resolved generation has already been dropped (another worker promoted
+    and retired it between our alias read and the open), the alias is resolved
+    once more before giving up.
+    """
+    for attempt in range(2):
+        with _pin_active(client) as name:
+            try:
+                collection = get_collection(client, name)
+            except Exception:
+                if attempt:
+                    raise
+                logger.warning("Active collection=%s is gone; re-resolving alias", name)
+                _alias_cache.clear()
+                continue
+            yield collection
+            return
+
+
+@contextmanager
+def _pin_active(client: chromadb.PersistentClient) -> Iterator[str]:
+    with _readers_lock:
+        name = get_active_collection_name()
+        _readers[name] = _readers.get(name, 0) + 1
+    try:
+        yield name
+    finally:
+        with _readers_lock:
+            _readers[name] -= 1
+            drop = _readers[name] == 0 and name in _retired
+            if _readers[name] == 0:
+                del _readers[name]
+            if drop:
+                _retired.discard(name)
+        if drop:
+            _drop_collection(client, name)
+
+
+def _drop_collection(client: chromadb.PersistentClient, name: str) -> None:
+    try:
+        client.delete_collection(name)
+        logger.info("Dropped retired collection=%s", name)
+    except Exception as e:
+        logger.warning("Failed to drop retired collection=%s: %s", name, e)
+    vector_index.remove_index(CHROMA_DIR, name)
+
+
+def create_staging_collection(client: chromadb.PersistentClient):
+    """Create an empty, uniquely named collection to build the next index generation into."""
+    name = f"{COLLECTION_NAME}_{time.strftime('%Y%m%d%H%M%S', time.gmtime())}_{uuid.uuid4().hex[:8]}"
+    return client.create_collection(name=name)
+
+
+def build_numpy_index(staging: Any, dtype: Optional[str] = None) -> str:
+    """Export a staging collection's embeddings into a memory-mapped numpy index.
+
+    Reuses the embeddings Chroma already computed, so the numpy engine costs one
+    extra read of the collection rather than a second embedding pass. The
+    collection is paged NUMPY_INDEX_EXPORT_BATCH records at a time, so export
+    memory stays bounded like ingest itself.
+    """
+    count = staging.count()
+
+    def _pages() -> Iterator[Tuple[Any, List[str], List[str], List[Dict[str, Any]]]]:
+        for offset in range(0, count, NUMPY_INDEX_EXPORT_BATCH):
+            res = staging.get(
+                limit=NUMPY_INDEX_EXPORT_BATCH,
+                offset=offset,
+                include=["embeddings", "documents", "metadatas"],
+            )
+            embeddings = res.get("embeddings")
+            yield (
+                embeddings if embeddings is not None else [],
+                res.get("ids") or [],
+                res.get("documents") or [],
+                res.get("metadatas") or [],
+            )
+
+    path = vector_index.index_path(CHROMA_DIR, staging.name)
+    vector_index.build_index_from_batches(path, _pages(), count, dtype=dtype or NUMPY_INDEX_DTYPE)
+    return path
+
+
+def promote_collection(client: chromadb.PersistentClient, staging: Any, expected_count: int) -> str:
+    """Validate a staging collection and atomically point the `docs` alias at it.
+
+    The collection being replaced is kept as the alias's `previous` generation so
+    queries still running against it in other worker processes can finish. The
+    generation it displaces in turn is retired: dropped immediately when no local
+    query is reading it, otherwise by the last local reader on release. On failed
+    validation the staging collection is dropped and the live alias is untouched.
+    """
+    try:
+        count = staging.count()
+    except Exception:
+        count = -1
+    if count != expected_count:
+        _drop_collection(client, staging.name)
+        raise ValueError(
+            f"Staging collection {staging.name} has {count} chunks, expected {expected_count}"
+        )
+
+    # A fresh store has no legacy `docs` collection to keep around.
+    legacy_exists = _collection_exists(client, COLLECTION_NAME)
+
+    # The file lock keeps concurrent ingests in different workers from both
+    # reading the same `previous` and leaking a generation. Queries never take
+    # it, so they are not blocked by the Chroma call or the fsync'd write.
+    with _alias_update_lock():
+        previous: Optional[str] = get_active_collection_name()
+        expired = _read_alias().get("previous")
+        if previous == COLLECTION_NAME and not legacy_exists:
+            previous = None
+        _write_alias(staging.name, previous)
+    if expired in (None, staging.name, previous):
+        expired = None
+
+    with _readers_lock:
+        drop_now = expired is not None and _readers.get(expired, 0) == 0
+        if expired is not None and not drop_now:
+            _retired.add(expired)
+
+    logger.info("Promoted collection=%s (previous=%s count=%s)", staging.name, previous, count)
+    if drop_now:
+        _drop_collection(client, expired)
+    return staging.name
 
 
 def make_answer_from_snippets(question: str, snippets: List[str]) -> str:
@@ -31,23 +293,46 @@ def make_answer_from_snippets(question: str, snippets: List[str]) -> str:
     return best
 
 
-def query_rag(question: str, top_k: int = 3) -> Dict[str, Any]:
+def _query_numpy(
+    client: chromadb.PersistentClient, q: str, top_k: int
+) -> Optional[Tuple[List[str], List[Dict[str, Any]]]]:
+    with _pin_active(client) as name:
+        index = vector_index.load_index(CHROMA_DIR, name)
+        if index is None:
+            return None
+        query_vec = get_embedding_function()([q])
+        rows = index.search(query_vec, top_k)[0][0]
+        return [index.document(i) for i in rows], [index.metadata(i) for i in rows]
+
+
+def query_rag(question: str, top_k: int = 3, engine: Optional[str] = None) -> Dict[str, Any]:
     t0 = time.perf_counter()
 
     q = (question or "").strip()
     if not q:
         return {"status": "error", "message": "Question is empty.", "answer": "", "citations": []}
 
-    client = get_client()
-    collection = get_collection(client)
+    engine = (engine or RETRIEVAL_ENGINE).lower()
+    if engine not in RETRIEVAL_ENGINES:
+        message = f"Unknown retrieval engine: {engine}"
+        return {"status": "error", "message": message, "answer": "", "citations": []}
 
-    res = collection.query(
-        query_texts=[q],
-        n_results=int(top_k or 3),
-        include=["documents", "metadatas", "distances"],
-    )
-    docs = (res.get("documents") or [[]])[0]
-    metas = (res.get("metadatas") or [[]])[0]
+    client = get_client()
+    found = _query_numpy(client, q, int(top_k or 3)) if engine == "numpy" else None
+    if found is not None:
+        docs, metas = found
+    else:
+        if engine == "numpy":
+            logger.warning("No numpy index for active collection; falling back to chroma")
+            engine = "chroma"
+        with acquire_collection(client) as collection:
+            res = collection.query(
+                query_texts=[q],
+                n_results=int(top_k or 3),
+                include=["documents", "metadatas", "distances"],
+            )
+        docs = (res.get("documents") or [[]])[0]
+        metas = (res.get("metadatas") or [[]])[0]
 
     citations: List[Dict[str, Any]] = []
     for i in range(min(len(docs), len(metas))):
@@ -71,4 +356,5 @@ def query_rag(question: str, top_k: int = 3) -> Dict[str, Any]:
         "num_citations": len(citations),
         "latency_ms": latency_ms,
         "top_source": citations[0]["source"] if citations else None,
+        "engine": engine,
     }
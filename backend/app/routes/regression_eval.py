@@ -1,9 +1,10 @@
 import logging
-from typing import Any, Dict
+from typing import Any, Dict, List
 
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 
+from ..eval import store as eval_store
 from ..eval.regression import run_regression_eval
 from ..rag import query_rag
 
@@ -22,3 +23,19 @@ def regression_eval(req: RegressionEvalRequest) -> Dict[str, Any]:
     summary = run_regression_eval(query_fn=query_rag, top_k=req.top_k)
     logger.info("Regression eval summary run_id=%s", summary.get("run_id"))
     return summary
+
+
+@router.get("/eval/runs")
+def eval_runs(limit: int = 100, metrics: bool = False) -> List[Dict[str, Any]]:
+    if metrics:
+        return eval_store.run_metrics(limit=limit)
+    return eval_store.list_runs(limit=limit)
+
+
+@router.get("/eval/compare")
+def eval_compare(base: str, candidate: str) -> Dict[str, Any]:
+    logger.info("Comparing eval runs base=%s candidate=%s", base, candidate)
+    missing = [run_id for run_id in (base, candidate) if eval_store.get_run(run_id) is None]
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Unknown run_id(s): {', '.join(missing)}")
+    return eval_store.compare_runs(base, candidate)
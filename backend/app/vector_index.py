@@ -0,0 +1,290 @@
+"""Exact brute-force vector index stored as memory-mapped NumPy arrays.
+
+Layout of an index directory (one per collection generation):
+
+    meta.json          dtype, count, dim, source names
+    vectors.npy        (n, dim) float32, float16 or int8, L2-normalized
+    scales.npy         (n,) float32 per-row dequantization scale (int8 only)
+    source_codes.npy   (n,) int32 index into meta["sources"]
+    chunks.npy         (n,) int32 chunk number within the source
+    doc_offsets.npy    (n + 1,) int64 byte offsets into documents.bin
+    documents.bin      concatenated UTF-8 chunk texts
+    id_offsets.npy     (n + 1,) int64 byte offsets into ids.bin
+    ids.bin            concatenated UTF-8 chunk ids
+
+Everything is opened read-only with mmap, so every worker process on a host
+shares the same page-cache pages instead of holding a private copy.
+"""
+import json
+import logging
+import os
+import shutil
+import threading
+import uuid
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+INDEX_SUBDIR = "numpy_index"
+SUPPORTED_DTYPES = ("float32", "float16", "int8")
+# float16 and int8 halve or quarter the footprint but are converted to float32
+# block by block on every query, which makes single queries several times slower.
+DEFAULT_DTYPE = "float32"
+# Small enough that each dequantized float32 block stays cache resident.
+BLOCK_ROWS = 4096
+
+_cache_lock = threading.Lock()
+_open_indexes: Dict[str, "NumpyVectorIndex"] = {}
+
+
+def index_path(root: str, name: str) -> str:
+    return os.path.join(root, INDEX_SUBDIR, name)
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if vectors.ndim == 1:
+        vectors = vectors[None, :]
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def build_index(
+    path: str,
+    embeddings: Any,
+    ids: Sequence[str],
+    documents: Sequence[str],
+    metadatas: Sequence[Dict[str, Any]],
+    dtype: str = DEFAULT_DTYPE,
+) -> None:
+    """Write a new index directory at `path` from in-memory arrays."""
+    build_index_from_batches(path, [(embeddings, ids, documents, metadatas)], len(ids), dtype)
+
+
+def build_index_from_batches(
+    path: str,
+    batches: Iterable[Tuple[Any, Sequence[str], Sequence[str], Sequence[Dict[str, Any]]]],
+    count: int,
+    dtype: str = DEFAULT_DTYPE,
+) -> None:
+    """Write a new index directory at `path` from `(embeddings, ids, documents, metadatas)` batches.
+
+    Vectors are written straight into a preallocated memory-mapped file, so
+    memory is bounded by the batch size rather than `count`. Files are written
+    to a temporary sibling directory first and renamed into place, so a reader
+    never observes a half-written index.
+    """
+    if dtype not in SUPPORTED_DTYPES:
+        raise ValueError(f"Unsupported index dtype {dtype!r}; expected one of {SUPPORTED_DTYPES}")
+
+    tmp_path = f"{path}.tmp-{uuid.uuid4().hex[:8]}"
+    os.makedirs(tmp_path)
+    try:
+        vectors: Optional[np.ndarray] = None
+        scales: Optional[np.ndarray] = None
+        sources: Dict[str, int] = {}
+        source_codes = np.empty(count, dtype=np.int32)
+        chunks = np.empty(count, dtype=np.int32)
+        offsets = np.zeros(count + 1, dtype=np.int64)
+        id_offsets = np.zeros(count + 1, dtype=np.int64)
+        row = 0
+        with open(os.path.join(tmp_path, "documents.bin"), "wb") as f, open(
+            os.path.join(tmp_path, "ids.bin"), "wb"
+        ) as id_file:
+            for embeddings, ids, documents, metadatas in batches:
+                if not len(ids):
+                    continue
+                block = _normalize(embeddings)
+                n = block.shape[0]
+                if not n == len(ids) == len(documents) or row + n > count:
+                    raise ValueError(
+                        f"Got {n} embeddings for {len(ids)} ids and {len(documents)} documents "
+                        f"at row {row} of {count}"
+                    )
+
+                if vectors is None:
+                    vectors = np.lib.format.open_memmap(
+                        os.path.join(tmp_path, "vectors.npy"),
+                        mode="w+",
+                        dtype=dtype,
+                        shape=(count, block.shape[1]),
+                    )
+                    if dtype == "int8":
+                        scales = np.lib.format.open_memmap(
+                            os.path.join(tmp_path, "scales.npy"),
+                            mode="w+",
+                            dtype=np.float32,
+                            shape=(count,),
+                        )
+                if scales is not None:
+                    block_scales = np.abs(block).max(axis=1) / 127.0
+                    block_scales = np.where(block_scales == 0, 1.0, block_scales).astype(np.float32)
+                    vectors[row : row + n] = np.round(block / block_scales[:, None]).astype(np.int8)
+                    scales[row : row + n] = block_scales
+                else:
+                    vectors[row : row + n] = block
+
+                for j, (chunk_id, doc, meta) in enumerate(zip(ids, documents, metadatas)):
+                    i = row + j
+                    encoded_id = str(chunk_id).encode("utf-8")
+                    id_file.write(encoded_id)
+                    id_offsets[i + 1] = id_offsets[i] + len(encoded_id)
+                    meta = meta or {}
+                    source = str(meta.get("source") or "")
+                    source_codes[i] = sources.setdefault(source, len(sources))
+                    chunks[i] = int(meta.get("chunk") or 0)
+                    data = (doc or "").encode("utf-8")
+                    f.write(data)
+                    offsets[i + 1] = offsets[i] + len(data)
+                row += n
+
+        if row != count:
+            raise ValueError(f"Got {row} rows, expected {count}")
+        if vectors is None:
+            dim = 0
+            np.save(os.path.join(tmp_path, "vectors.npy"), np.zeros((0, 0), dtype=dtype))
+            if dtype == "int8":
+                np.save(os.path.join(tmp_path, "scales.npy"), np.zeros(0, dtype=np.float32))
+        else:
+            dim = int(vectors.shape[1])
+            vectors.flush()
+            if scales is not None:
+                scales.flush()
+            # Release the write mappings before the directory is renamed.
+            del vectors, scales
+        np.save(os.path.join(tmp_path, "source_codes.npy"), source_codes)
+        np.save(os.path.join(tmp_path, "chunks.npy"), chunks)
+        np.save(os.path.join(tmp_path, "doc_offsets.npy"), offsets)
+        np.save(os.path.join(tmp_path, "id_offsets.npy"), id_offsets)
+
+        with open(os.path.join(tmp_path, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump(
+                {"version": 3, "dtype": dtype, "count": count, "dim": dim, "sources": list(sources)},
+                f,
+            )
+        os.replace(tmp_path, path)
+    except Exception:
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        raise
+    logger.info("Built numpy index path=%s count=%s dtype=%s", path, count, dtype)
+
+
+def _load_blob(path: str) -> np.ndarray:
+    # np.memmap cannot map an empty file.
+    if os.path.getsize(path):
+        return np.memmap(path, dtype=np.uint8, mode="r")
+    return np.zeros(0, dtype=np.uint8)
+
+
+class NumpyVectorIndex:
+    """Read-only view over an index directory written by `build_index`."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(os.path.join(path, "meta.json"), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        self.dtype: str = meta["dtype"]
+        self.count: int = int(meta["count"])
+        self.dim: int = int(meta["dim"])
+        self.sources: List[str] = meta["sources"]
+
+        def _load(name: str) -> np.ndarray:
+            return np.load(os.path.join(path, name), mmap_mode="r")
+
+        self.vectors = _load("vectors.npy")
+        self.scales = _load("scales.npy") if self.dtype == "int8" else None
+        self.source_codes = _load("source_codes.npy")
+        self.chunks = _load("chunks.npy")
+        self.doc_offsets = _load("doc_offsets.npy")
+        self.documents = _load_blob(os.path.join(path, "documents.bin"))
+        self.id_offsets = _load("id_offsets.npy")
+        self.ids = _load_blob(os.path.join(path, "ids.bin"))
+
+    def __len__(self) -> int:
+        return self.count
+
+    def search(self, queries: Any, top_k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Exact inner-product top-k for a batch of query vectors.
+
+        Returns `(indices, scores)`, each shaped `(num_queries, k)` and sorted by
+        descending cosine similarity. The matrix is scanned in blocks of
+        BLOCK_ROWS so dequantization never materializes the full float32 copy.
+        """
+        q = _normalize(queries)
+        k = max(0, min(int(top_k), self.count))
+        if k == 0:
+            empty = np.zeros((q.shape[0], 0))
+            return empty.astype(np.int64), empty.astype(np.float32)
+
+        best_idx: Optional[np.ndarray] = None
+        best_scores: Optional[np.ndarray] = None
+        for start in range(0, self.count, BLOCK_ROWS):
+            block = np.asarray(self.vectors[start : start + BLOCK_ROWS], dtype=np.float32)
+            scores = q @ block.T
+            if self.scales is not None:
+                scores *= self.scales[start : start + BLOCK_ROWS]
+
+            if scores.shape[1] > k:
+                part = np.argpartition(scores, -k, axis=1)[:, -k:]
+                scores = np.take_along_axis(scores, part, axis=1)
+            else:
+                part = np.broadcast_to(np.arange(scores.shape[1]), scores.shape)
+            part = part + start
+
+            if best_idx is None:
+                best_idx, best_scores = part, scores
+                continue
+            merged_idx = np.concatenate([best_idx, part], axis=1)
+            merged_scores = np.concatenate([best_scores, scores], axis=1)
+            keep = np.argpartition(merged_scores, -k, axis=1)[:, -k:]
+            best_idx = np.take_along_axis(merged_idx, keep, axis=1)
+            best_scores = np.take_along_axis(merged_scores, keep, axis=1)
+
+        order = np.argsort(-best_scores, axis=1, kind="stable")
+        return (
+            np.take_along_axis(best_idx, order, axis=1).astype(np.int64),
+            np.take_along_axis(best_scores, order, axis=1),
+        )
+
+    def document(self, i: int) -> str:
+        start, end = int(self.doc_offsets[i]), int(self.doc_offsets[i + 1])
+        return bytes(self.documents[start:end]).decode("utf-8")
+
+    def chunk_id(self, i: int) -> str:
+        start, end = int(self.id_offsets[i]), int(self.id_offsets[i + 1])
+        return bytes(self.ids[start:end]).decode("utf-8")
+
+    def metadata(self, i: int) -> Dict[str, Any]:
+        return {"source": self.sources[int(self.source_codes[i])], "chunk": int(self.chunks[i])}
+
+
+def load_index(root: str, name: str) -> Optional[NumpyVectorIndex]:
+    """Return the (process-cached) index for a collection, or None if none was built.
+
+    Loading a generation that is not cached yet (i.e. after a promote) also
+    evicts cached indexes whose directory is gone. Another worker may have
+    retired them, and holding their maps would keep the deleted files alive.
+    """
+    with _cache_lock:
+        index = _open_indexes.get(name)
+        if index is not None:
+            return index
+        for cached_name, cached in list(_open_indexes.items()):
+            if not os.path.isfile(os.path.join(cached.path, "meta.json")):
+                del _open_indexes[cached_name]
+                logger.info("Evicted removed numpy index path=%s", cached.path)
+        path = index_path(root, name)
+        if not os.path.isfile(os.path.join(path, "meta.json")):
+            return None
+        index = NumpyVectorIndex(path)
+        _open_indexes[name] = index
+        return index
+
+
+def remove_index(root: str, name: str) -> None:
+    with _cache_lock:
+        _open_indexes.pop(name, None)
+    shutil.rmtree(index_path(root, name), ignore_errors=True)
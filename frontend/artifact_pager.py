@@ -0,0 +1,67 @@
+"""Lazy, paged access to large `regression_*.jsonl` eval artifacts.
+
+A file is scanned once for line start offsets (a compact int64 array); pages
+are then read by seeking straight to the first line, so viewing page N of a
+multi-hundred-MB file only parses `page_size` records.
+"""
+import json
+from pathlib import Path
+from typing import Any, Dict, List
+
+import numpy as np
+
+SCAN_BLOCK_BYTES = 16 * 1024 * 1024
+
+
+def list_artifacts(artifact_dir: Path, pattern: str = "regression_*.jsonl") -> List[Dict[str, Any]]:
+    """Artifact files, newest first."""
+    files = []
+    for path in Path(artifact_dir).glob(pattern):
+        stat = path.stat()
+        files.append(
+            {"path": str(path), "name": path.name, "size_bytes": stat.st_size, "mtime": stat.st_mtime}
+        )
+    return sorted(files, key=lambda f: f["mtime"], reverse=True)
+
+
+def line_offsets(path: str) -> np.ndarray:
+    """Byte offsets such that line i spans `offsets[i]:offsets[i + 1]`."""
+    parts = [np.zeros(1, dtype=np.int64)]
+    pos = 0
+    with open(path, "rb") as f:
+        while True:
+            block = f.read(SCAN_BLOCK_BYTES)
+            if not block:
+                break
+            newlines = np.flatnonzero(np.frombuffer(block, dtype=np.uint8) == 10)
+            parts.append(newlines.astype(np.int64) + pos + 1)
+            pos += len(block)
+    offsets = np.concatenate(parts)
+    if offsets[-1] != pos:
+        # Last line has no trailing newline.
+        offsets = np.append(offsets, pos)
+    return offsets
+
+
+def num_records(offsets: np.ndarray) -> int:
+    return max(0, len(offsets) - 1)
+
+
+def read_page(path: str, offsets: np.ndarray, page: int, page_size: int) -> List[Dict[str, Any]]:
+    start = max(0, page) * page_size
+    end = min(start + page_size, num_records(offsets))
+    if start >= end:
+        return []
+    with open(path, "rb") as f:
+        f.seek(int(offsets[start]))
+        data = f.read(int(offsets[end] - offsets[start]))
+
+    records = []
+    for line in data.splitlines():
+        if not line.strip():
+            continue
+        try:
+            records.append(json.loads(line))
+        except ValueError:
+            continue
+    return records
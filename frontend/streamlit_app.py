@@ -1,35 +1,164 @@
-import streamlit as st
+import os
+from pathlib import Path
+from typing import Any, Dict, List
+
+import numpy as np
+import pandas as pd
 import requests
+import streamlit as st
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
-API_BASE = "http://127.0.0.1:8000"
+from artifact_pager import line_offsets, list_artifacts, num_records, read_page
 
-st.set_page_config(page_title="AI RAG Eval Platform", layout="centered")
-st.title("AI RAG Eval Platform")
-st.caption("Thin-slice UI: sends a question to FastAPI /query and displays the response.")
+API_BASE = os.getenv("API_BASE", "http://127.0.0.1:8000")
+ARTIFACT_DIR = Path(
+    os.getenv("EVAL_ARTIFACT_DIR", Path(__file__).resolve().parents[1] / "artifacts" / "eval_runs")
+)
+PAGE_SIZE = 200
+
+st.set_page_config(page_title="AI RAG Eval Platform", layout="wide")
+
+
+# ----------------------------
+# API access (pooled, cached)
+# ----------------------------
+@st.cache_resource
+def get_session() -> requests.Session:
+    """One keep-alive connection pool shared by every rerun and browser session."""
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=16,
+        max_retries=Retry(total=2, connect=2, read=0, backoff_factor=0.2),
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+# Not cached: answers change after a reindex and latency_ms must be current.
+# Only the read-only GET endpoints below are cached.
+def ask(question: str, top_k: int) -> Dict[str, Any]:
+    r = get_session().post(f"{API_BASE}/query", json={"question": question, "top_k": top_k}, timeout=30)
+    r.raise_for_status()
+    return r.json()
+
+
+@st.cache_data(ttl=30, show_spinner=False)
+def fetch_run_metrics(limit: int) -> List[Dict[str, Any]]:
+    r = get_session().get(f"{API_BASE}/eval/runs", params={"limit": limit, "metrics": True}, timeout=30)
+    r.raise_for_status()
+    return r.json()
+
+
+# ----------------------------
+# Artifact access (lazy, cached)
+# ----------------------------
+@st.cache_data(ttl=30, show_spinner=False)
+def cached_artifacts(artifact_dir: str) -> List[Dict[str, Any]]:
+    return list_artifacts(Path(artifact_dir))
+
+
+# mtime and size are part of the cache key so a rewritten file is rescanned.
+@st.cache_data(max_entries=8, show_spinner="Indexing artifact...")
+def cached_offsets(path: str, mtime: float, size: int) -> np.ndarray:
+    return line_offsets(path)
 
-question = st.text_input("Ask a question", placeholder="e.g., What is our refund policy?")
 
-col1, col2 = st.columns([1, 1])
-with col1:
-    ask = st.button("Ask")
-with col2:
-    st.write("")
+@st.cache_data(max_entries=64, show_spinner=False)
+def cached_page(path: str, mtime: float, size: int, page: int, page_size: int) -> pd.DataFrame:
+    records = read_page(path, cached_offsets(path, mtime, size), page, page_size)
+    return pd.DataFrame.from_records(records)
 
-if ask:
+
+# ----------------------------
+# Views
+# ----------------------------
+@st.fragment
+def ask_view() -> None:
+    st.caption("Sends a question to FastAPI /query and displays the response.")
+    with st.form("ask"):
+        question = st.text_input("Ask a question", placeholder="e.g., What is our refund policy?")
+        top_k = st.slider("top_k", min_value=1, max_value=10, value=3)
+        submitted = st.form_submit_button("Ask")
+
+    if not submitted:
+        return
     if not question.strip():
         st.warning("Type a question first.")
-    else:
-        try:
-            r = requests.post(f"{API_BASE}/query", json={"question": question}, timeout=30)
-            r.raise_for_status()
-            data = r.json()
-            st.subheader("Answer")
-            st.write(data.get("answer", ""))
-
-            st.subheader("Citations")
-            st.write(data.get("citations", []))
-
-            st.subheader("Raw response")
-            st.json(data)
-        except Exception as e:
-            st.error(f"Request failed: {e}")
+        return
+    try:
+        data = ask(question.strip(), top_k)
+    except Exception as e:
+        st.error(f"Request failed: {e}")
+        return
+
+    st.subheader("Answer")
+    st.write(data.get("answer", ""))
+    st.subheader("Citations")
+    st.write(data.get("citations", []))
+    with st.expander("Raw response"):
+        st.json(data)
+
+
+@st.fragment
+def runs_view() -> None:
+    limit = st.slider("Runs to show", min_value=5, max_value=500, value=50, step=5)
+    try:
+        runs = fetch_run_metrics(limit)
+    except Exception as e:
+        st.error(f"Could not load runs from {API_BASE}/eval/runs: {e}")
+        return
+    if not runs:
+        st.info("No eval runs stored yet. Run POST /eval/regression or /eval/run.")
+        return
+
+    df = pd.DataFrame(runs).sort_values("created_at", na_position="first").set_index("run_id")
+    st.subheader("Latency percentiles (ms)")
+    st.line_chart(df[["latency_p50_ms", "latency_p95_ms", "latency_p99_ms"]])
+    st.subheader("Citation hit rate")
+    st.bar_chart(df[["citation_coverage_rate"]])
+    st.dataframe(df, width="stretch")
+
+
+@st.fragment
+def artifacts_view() -> None:
+    files = cached_artifacts(str(ARTIFACT_DIR))
+    if not files:
+        st.info(f"No regression_*.jsonl artifacts in {ARTIFACT_DIR}")
+        return
+
+    names = [f["name"] for f in files]
+    choice = st.selectbox("Artifact", names)
+    meta = files[names.index(choice)]
+    offsets = cached_offsets(meta["path"], meta["mtime"], meta["size_bytes"])
+    total = num_records(offsets)
+    pages = max(1, -(-total // PAGE_SIZE))
+
+    page = st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, value=1) - 1
+    st.caption(f"{total:,} records, {meta['size_bytes'] / 1e6:,.1f} MB — showing {PAGE_SIZE} per page")
+    df = cached_page(meta["path"], meta["mtime"], meta["size_bytes"], int(page), PAGE_SIZE)
+    if df.empty:
+        st.info("Empty page.")
+        return
+
+    if {"variant", "latency_ms"} <= set(df.columns):
+        by_variant = df.groupby("variant")["latency_ms"].quantile([0.5, 0.95, 0.99]).unstack()
+        by_variant.columns = ["p50", "p95", "p99"]
+        st.subheader("Latency on this page by variant (ms)")
+        st.bar_chart(by_variant)
+    if {"variant", "citation_coverage"} <= set(df.columns):
+        st.subheader("Citation hit rate on this page by variant")
+        st.bar_chart(df.groupby("variant")["citation_coverage"].mean())
+    st.dataframe(df, width="stretch")
+
+
+st.title("AI RAG Eval Platform")
+ask_tab, runs_tab, artifacts_tab = st.tabs(["Ask", "Eval runs", "Artifacts"])
+with ask_tab:
+    ask_view()
+with runs_tab:
+    runs_view()
+with artifacts_tab:
+    artifacts_view()
@@ -0,0 +1,123 @@
+"""Recall-versus-latency comparison of the Chroma and numpy retrieval engines.
+
+Uses synthetic clustered embeddings so no embedding model is needed:
+
+    python scripts/bench_retrieval.py --n 100000 --dim 384 --queries 200 --top-k 5
+
+Ground truth is exact float32 search; recall@k is the fraction of true top-k
+chunk ids each engine returns.
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from backend.app.vector_index import NumpyVectorIndex, build_index
+
+
+def _synthetic(n: int, dim: int, queries: int, seed: int):
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((max(1, n // 200), dim)).astype(np.float32)
+    assign = rng.integers(0, len(centers), size=n)
+    corpus = centers[assign] + 0.3 * rng.standard_normal((n, dim)).astype(np.float32)
+    q_assign = rng.integers(0, len(centers), size=queries)
+    qs = centers[q_assign] + 0.3 * rng.standard_normal((queries, dim)).astype(np.float32)
+    corpus /= np.linalg.norm(corpus, axis=1, keepdims=True)
+    qs /= np.linalg.norm(qs, axis=1, keepdims=True)
+    return corpus, qs
+
+
+def _exact_topk(corpus: np.ndarray, qs: np.ndarray, k: int) -> np.ndarray:
+    scores = qs @ corpus.T
+    part = np.argpartition(scores, -k, axis=1)[:, -k:]
+    return part
+
+
+def _recall(found: List[List[int]], truth: np.ndarray) -> float:
+    hits = sum(len(set(f) & set(t.tolist())) for f, t in zip(found, truth))
+    return hits / truth.size
+
+
+def _time_each(fn: Callable[[np.ndarray], List[int]], qs: np.ndarray):
+    found, lat = [], []
+    for q in qs:
+        t0 = time.perf_counter()
+        found.append(fn(q))
+        lat.append((time.perf_counter() - t0) * 1000)
+    return found, lat
+
+
+def _row(name: str, recall: float, lat: List[float], batch_qps: float = 0.0) -> Dict[str, str]:
+    arr = np.asarray(lat)
+    return {
+        "engine": name,
+        "recall": f"{recall:.4f}",
+        "p50_ms": f"{np.percentile(arr, 50):.2f}",
+        "p95_ms": f"{np.percentile(arr, 95):.2f}",
+        "batch_qps": f"{batch_qps:.0f}" if batch_qps else "-",
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--n", type=int, default=50000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--skip-chroma", action="store_true")
+    args = parser.parse_args()
+
+    corpus, qs = _synthetic(args.n, args.dim, args.queries, args.seed)
+    truth = _exact_topk(corpus, qs, args.top_k)
+    ids = [f"c{i}" for i in range(args.n)]
+    docs = [""] * args.n
+    metas = [{"source": "synthetic", "chunk": i} for i in range(args.n)]
+    rows = []
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for dtype in ("float32", "float16", "int8"):
+            path = str(Path(tmp) / dtype)
+            build_index(path, corpus, ids, docs, metas, dtype=dtype)
+            index = NumpyVectorIndex(path)
+            found, lat = _time_each(lambda q: index.search(q, args.top_k)[0][0].tolist(), qs)
+            t0 = time.perf_counter()
+            index.search(qs, args.top_k)
+            batch_qps = len(qs) / (time.perf_counter() - t0)
+            rows.append(_row(f"numpy-{dtype}", _recall(found, truth), lat, batch_qps))
+
+        if not args.skip_chroma:
+            import chromadb
+
+            client = chromadb.PersistentClient(path=str(Path(tmp) / "chroma"))
+            col = client.create_collection("bench", metadata={"hnsw:space": "cosine"})
+            step = 5000
+            for start in range(0, args.n, step):
+                col.add(
+                    ids=ids[start : start + step],
+                    embeddings=corpus[start : start + step],
+                    metadatas=metas[start : start + step],
+                )
+
+            def _chroma(q: np.ndarray) -> List[int]:
+                res = col.query(query_embeddings=[q], n_results=args.top_k, include=[])
+                return [int(i[1:]) for i in res["ids"][0]]
+
+            found, lat = _time_each(_chroma, qs)
+            rows.append(_row("chroma-hnsw", _recall(found, truth), lat))
+
+    print(f"n={args.n} dim={args.dim} queries={args.queries} top_k={args.top_k}")
+    header = f"{'engine':<16}{'recall@k':>10}{'p50_ms':>10}{'p95_ms':>10}{'batch_qps':>12}"
+    print(header)
+    for r in rows:
+        print(f"{r['engine']:<16}{r['recall']:>10}{r['p50_ms']:>10}{r['p95_ms']:>10}{r['batch_qps']:>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+pytest.importorskip("numpy")
+
+from frontend import artifact_pager
+from frontend.artifact_pager import line_offsets, list_artifacts, num_records, read_page
+
+
+def _write(path: Path, n: int, trailing_newline: bool = True) -> None:
+    lines = [json.dumps({"question_id": f"q{i}", "latency_ms": i}) for i in range(n)]
+    path.write_text("\n".join(lines) + ("\n" if trailing_newline else ""), encoding="utf-8")
+
+
+@pytest.mark.parametrize("trailing_newline", [True, False])
+def test_pages_are_read_by_offset(tmp_path: Path, monkeypatch, trailing_newline: bool):
+    # Tiny scan blocks so line boundaries straddle block edges.
+    monkeypatch.setattr(artifact_pager, "SCAN_BLOCK_BYTES", 7)
+    path = tmp_path / "regression_a.jsonl"
+    _write(path, 25, trailing_newline)
+
+    offsets = line_offsets(str(path))
+    assert num_records(offsets) == 25
+
+    page = read_page(str(path), offsets, page=2, page_size=10)
+    assert [r["question_id"] for r in page] == [f"q{i}" for i in range(20, 25)]
+    assert read_page(str(path), offsets, page=3, page_size=10) == []
+
+
+def test_list_artifacts_filters_and_handles_empty_files(tmp_path: Path):
+    (tmp_path / "regression_empty.jsonl").write_text("", encoding="utf-8")
+    (tmp_path / "eval_results.sqlite").write_text("", encoding="utf-8")
+
+    files = list_artifacts(tmp_path)
+    assert [f["name"] for f in files] == ["regression_empty.jsonl"]
+    assert num_records(line_offsets(files[0]["path"])) == 0
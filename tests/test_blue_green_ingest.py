@@ -0,0 +1,148 @@
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+pytest.importorskip("chromadb")
+
+from backend.app import rag
+
+
+class _FakeCollection:
+    def __init__(self, name: str):
+        self.name = name
+        self.ids = []
+
+    def add(self, ids, documents, metadatas):
+        self.ids.extend(ids)
+
+    def count(self):
+        return len(self.ids)
+
+
+class _FakeClient:
+    def __init__(self):
+        self.collections = {}
+        self.deleted = []
+
+    def create_collection(self, name):
+        self.collections[name] = _FakeCollection(name)
+        return self.collections[name]
+
+    def get_collection(self, name):
+        if name not in self.collections:
+            raise ValueError(f"Collection {name} does not exist")
+        return self.collections[name]
+
+    def get_or_create_collection(self, name):
+        return self.collections.setdefault(name, _FakeCollection(name))
+
+    def delete_collection(self, name):
+        if name not in self.collections:
+            raise ValueError(f"Collection {name} does not exist")
+        del self.collections[name]
+        self.deleted.append(name)
+
+
+@pytest.fixture
+def client(tmp_path: Path, monkeypatch):
+    monkeypatch.setattr(rag, "CHROMA_DIR", str(tmp_path))
+    return _FakeClient()
+
+
+def _build(client, n: int):
+    staging = rag.create_staging_collection(client)
+    staging.add(ids=[f"c{i}" for i in range(n)], documents=[""] * n, metadatas=[{}] * n)
+    return staging
+
+
+def test_promote_swaps_alias_and_keeps_one_previous_generation(client, caplog):
+    assert rag.get_active_collection_name() == rag.COLLECTION_NAME
+
+    first = _build(client, 2)
+    assert rag.promote_collection(client, first, expected_count=2) == first.name
+    assert rag.get_active_collection_name() == first.name
+
+    second = _build(client, 3)
+    rag.promote_collection(client, second, expected_count=3)
+    assert rag.get_active_collection_name() == second.name
+    # Kept for queries still running in other workers.
+    assert first.name in client.collections
+
+    third = _build(client, 1)
+    rag.promote_collection(client, third, expected_count=1)
+    assert first.name in client.deleted
+    assert second.name in client.collections
+    # No legacy `docs` collection existed, so nothing failed to drop.
+    assert "Failed to drop" not in caplog.text
+
+
+def test_retired_collection_outlives_in_flight_reader(client):
+    first = _build(client, 1)
+    rag.promote_collection(client, first, expected_count=1)
+
+    with rag.acquire_collection(client) as live:
+        rag.promote_collection(client, _build(client, 1), expected_count=1)
+        third = _build(client, 1)
+        rag.promote_collection(client, third, expected_count=1)
+        assert live.name == first.name
+        assert first.name not in client.deleted
+
+    assert first.name in client.deleted
+    with rag.acquire_collection(client) as live:
+        assert live.name == third.name
+
+
+def test_reader_re_resolves_alias_when_generation_was_dropped(client):
+    first = _build(client, 1)
+    rag.promote_collection(client, first, expected_count=1)
+    second = _build(client, 1)
+
+    # Another worker promotes and drops `first` between our alias read and open.
+    real_get = client.get_collection
+
+    def racing_get(name):
+        if name == first.name and first.name in client.collections:
+            rag._write_alias(second.name, None)
+            client.delete_collection(first.name)
+        return real_get(name)
+
+    client.get_collection = racing_get
+    with rag.acquire_collection(client) as live:
+        assert live.name == second.name
+    assert first.name not in client.collections
+
+
+def test_concurrent_promotes_leave_exactly_two_generations(client):
+    stagings = [_build(client, 1) for _ in range(8)]
+    start = threading.Barrier(len(stagings))
+
+    def _promote(staging):
+        start.wait()
+        rag.promote_collection(client, staging, expected_count=1)
+
+    threads = [threading.Thread(target=_promote, args=(s,)) for s in stagings]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    # Every generation except the active one and its previous was recorded and dropped.
+    alias = rag._read_alias()
+    assert set(client.collections) == {alias["collection"], alias["previous"]}
+
+
+def test_failed_validation_keeps_live_collection(client):
+    first = _build(client, 2)
+    rag.promote_collection(client, first, expected_count=2)
+
+    bad = _build(client, 1)
+    with pytest.raises(ValueError):
+        rag.promote_collection(client, bad, expected_count=5)
+
+    assert rag.get_active_collection_name() == first.name
+    assert bad.name in client.deleted
+    assert first.name in client.collections
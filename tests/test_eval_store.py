@@ -0,0 +1,105 @@
+import json
+import sqlite3
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from backend.app.eval import store
+from backend.app.eval.regression import run_regression_eval
+
+DATASET = [
+    {"id": "refund", "question": "What is the refund policy?"},
+    {"id": "shipping", "question": "What is the shipping timeline?"},
+]
+VARIANTS = [{"name": "base", "prompt_prefix": ""}]
+
+
+def _query_v1(question: str, top_k: int):
+    if "refund" in question.lower():
+        return {"answer": "Refunds within 30 days.", "citations": [{"source": "a"}], "latency_ms": 10}
+    return {"answer": "I couldn't find an answer.", "citations": [], "latency_ms": 40}
+
+
+def _query_v2(question: str, top_k: int):
+    return {"answer": "Policy text.", "citations": [{"source": "a"}], "latency_ms": 25}
+
+
+def test_regression_runs_are_stored_and_compared(tmp_path: Path):
+    run_regression_eval(_query_v1, DATASET, VARIANTS, run_id="r1", artifact_dir=tmp_path)
+    run_regression_eval(_query_v2, DATASET, VARIANTS, run_id="r2", artifact_dir=tmp_path)
+    db_path = tmp_path / store.DB_FILENAME
+
+    assert store.get_run("r1", db_path=db_path)["summary"]["run_id"] == "r1"
+    assert {r["run_id"] for r in store.list_runs(db_path=db_path)} == {"r1", "r2"}
+
+    diff = store.compare_runs("r1", "r2", db_path=db_path)
+    assert diff["num_compared"] == 2
+    assert diff["num_changed"] == 1
+
+    shipping = next(q for q in diff["questions"] if q["question_id"] == "shipping")
+    assert shipping["changed"] == ["citation_coverage", "refusal"]
+    assert shipping["latency_ms_delta"] == -15
+
+    deltas = diff["variants"]["base"]["deltas"]
+    assert deltas["citation_coverage_rate"] == pytest.approx(0.5)
+    assert deltas["refusal_rate"] == pytest.approx(-0.5)
+    assert diff["variants"]["base"]["base"]["latency_p95_ms"] == 40
+    assert diff["variants"]["base"]["candidate"]["latency_p50_ms"] == 25
+
+    metrics = {m["run_id"]: m for m in store.run_metrics(db_path=db_path)}
+    assert metrics["r1"]["citation_coverage_rate"] == pytest.approx(0.5)
+    assert metrics["r1"]["latency_p99_ms"] == 40
+    assert metrics["r2"]["latency_p50_ms"] == 25
+
+
+def test_import_historical_artifacts_is_idempotent(tmp_path: Path):
+    db_path = tmp_path / "store.sqlite"
+    jsonl = tmp_path / "regression_old.jsonl"
+    jsonl.write_text(
+        "\n".join(
+            json.dumps(
+                {"run_id": "old", "variant": "base", "question_id": f"q{i}", "num_citations": i, "latency_ms": i}
+            )
+            for i in range(3)
+        ),
+        encoding="utf-8",
+    )
+    eval_json = tmp_path / "eval_20260101_000000.json"
+    eval_json.write_text(
+        json.dumps({"status": "ok", "results": [{"id": "p1", "question": "q", "num_citations": 2, "latency_ms": 5}]}),
+        encoding="utf-8-sig",
+    )
+
+    assert store.import_artifact(jsonl, db_path=db_path) == {"old": 3}
+    assert store.import_artifact(jsonl, db_path=db_path) == {"old": 3}
+    assert store.import_artifact(eval_json, db_path=db_path) == {"eval_20260101_000000": 1}
+
+    diff = store.compare_runs("old", "old", db_path=db_path)
+    assert diff["num_compared"] == 3
+    assert diff["variants"]["base"]["base"]["citation_coverage_rate"] == pytest.approx(0.6667)
+    assert store.get_run("eval_20260101_000000", db_path=db_path)["source"] == "import"
+
+    # Neither artifact has per-record timestamps: fall back to the filename, then mtime.
+    created = {r["run_id"]: r["created_at"] for r in store.list_runs(db_path=db_path)}
+    assert created["eval_20260101_000000"] == "2026-01-01T00:00:00Z"
+    assert created["old"] is not None
+
+
+def test_records_without_question_id_are_keyed_deterministically(tmp_path: Path):
+    db_path = tmp_path / "store.sqlite"
+    jsonl = tmp_path / "regression_noid.jsonl"
+    records = [{"run_id": "noid", "question": f"Question {i}?", "latency_ms": i} for i in range(3)]
+    records.append({"run_id": "noid", "latency_ms": 9})
+    jsonl.write_text("\n".join(json.dumps(r) for r in records), encoding="utf-8")
+
+    store.import_artifact(jsonl, db_path=db_path)
+    store.import_artifact(jsonl, db_path=db_path)
+    with sqlite3.connect(str(db_path)) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM results").fetchone()[0] == 4
+
+    store.write_run("noid2", [{**r, "run_id": "noid2"} for r in records[:2]], db_path=db_path)
+    assert store.compare_runs("noid", "noid2", db_path=db_path)["num_compared"] == 2
+
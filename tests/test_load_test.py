@@ -0,0 +1,64 @@
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from scripts import load_test
+
+
+def test_schedule_is_open_loop_at_target_rate():
+    uniform = load_test.schedule(qps=10, duration_s=2, arrival="uniform")
+    assert len(uniform) == 20
+    assert uniform[1] - uniform[0] == pytest.approx(0.1)
+
+    poisson = load_test.schedule(qps=200, duration_s=5, arrival="poisson", seed=1)
+    assert 900 < len(poisson) < 1100
+    assert all(0 <= t < 5 for t in poisson)
+
+
+def test_replay_workload_reads_runs_csv_and_jsonl(tmp_path: Path):
+    csv_log = tmp_path / "runs.csv"
+    csv_log.write_text("timestamp,question,top_k\n2026-01-01,What is the refund policy?,4\n", encoding="utf-8")
+    jsonl_log = tmp_path / "queries.jsonl"
+    jsonl_log.write_text(json.dumps({"endpoint": "query_guarded", "question": "hi"}) + "\n", encoding="utf-8")
+
+    first = next(load_test.replay_workload(csv_log, "query", top_k=3))
+    assert first.endpoint == "query"
+    assert first.payload == {"question": "What is the refund policy?", "top_k": 4}
+
+    second = next(load_test.replay_workload(jsonl_log, "query", top_k=3))
+    assert second.endpoint == "query_guarded"
+
+
+def test_latency_includes_queueing_delay():
+    httpx = pytest.importorskip("httpx")
+    pytest.importorskip("fastapi")
+    from fastapi import FastAPI
+
+    app = FastAPI()
+    lock = asyncio.Lock()
+
+    @app.post("/query")
+    async def query(body: dict):
+        # Serialize requests so later arrivals queue behind earlier ones.
+        async with lock:
+            await asyncio.sleep(0.05)
+        return {"status": "ok"}
+
+    async def _run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            workload = load_test.synthetic_workload({"query": 1.0}, top_k=3, ingest_path="")
+            return await load_test.run_step(client, workload, qps=100, duration_s=0.2, arrival="uniform", seed=0)
+
+    summary = load_test.summarize(asyncio.run(_run()))
+    overall = summary["overall"]
+    assert overall["requests"] == 20
+    assert overall["error_rate"] == 0.0
+    # 20 requests at 100 qps against a 20 qps server: the last one waits ~0.8s.
+    assert overall["latency_p99.9_ms"] > 700
+    assert summary["endpoints"]["query"]["requests"] == 20
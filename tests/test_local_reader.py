@@ -0,0 +1,121 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from backend.app import local_reader
+from backend.app.local_reader import chunk_text, iter_documents, iter_local_files
+
+
+def _tree(root: Path) -> None:
+    (root / "nested" / "deeper").mkdir(parents=True)
+    (root / "node_modules").mkdir()
+    (root / "top.md").write_text("# Top\nRefunds within 30 days.", encoding="utf-8")
+    (root / "nested" / "top.md").write_text("Same basename, different folder.", encoding="utf-8")
+    (root / "nested" / "deeper" / "utf16.txt").write_text("Café hours 9–5", encoding="utf-16")
+    (root / "nested" / "legacy.txt").write_bytes("Résumé – naïve".encode("cp1252"))
+    (root / "nested" / "bom.txt").write_bytes("﻿Shipping takes 3 days".encode("utf-8"))
+    (root / "nested" / "skip.log").write_text("not ingested", encoding="utf-8")
+    (root / "node_modules" / "pkg.md").write_text("excluded", encoding="utf-8")
+
+
+def test_walk_is_recursive_and_honours_globs(tmp_path: Path):
+    _tree(tmp_path)
+    rel = [Path(p).relative_to(tmp_path).as_posix() for p in iter_local_files(str(tmp_path))]
+    assert rel == [
+        "top.md",
+        "nested/bom.txt",
+        "nested/legacy.txt",
+        "nested/top.md",
+        "nested/deeper/utf16.txt",
+    ]
+
+    only_nested_md = iter_local_files(str(tmp_path), include=["nested/*.md"], exclude=["deeper"])
+    assert [Path(p).name for p in only_nested_md] == ["top.md"]
+
+
+def test_documents_decode_mixed_encodings(tmp_path: Path):
+    _tree(tmp_path)
+    docs = {d["id"]: d for d in iter_documents(str(tmp_path), workers=3)}
+
+    assert set(docs) == {
+        "top.md",
+        "nested/top.md",
+        "nested/bom.txt",
+        "nested/legacy.txt",
+        "nested/deeper/utf16.txt",
+    }
+    assert docs["nested/deeper/utf16.txt"]["chunks"] == ["Café hours 9–5"]
+    assert docs["nested/legacy.txt"]["chunks"] == ["Résumé – naïve"]
+    assert docs["nested/bom.txt"]["chunks"] == ["Shipping takes 3 days"]
+
+
+def test_large_files_are_mmapped_and_chunked_identically(tmp_path: Path, monkeypatch):
+    text = "  \n" + "".join(f"Ünïcödé line {i} — détails.\n" for i in range(400))
+    (tmp_path / "big.md").write_text(text, encoding="utf-8")
+    (tmp_path / "huge.md").write_text(text * 10, encoding="utf-8")
+
+    monkeypatch.setattr(local_reader, "MMAP_THRESHOLD_BYTES", 1024)
+    # An odd window size splits multi-byte characters across windows.
+    monkeypatch.setattr(local_reader, "MMAP_WINDOW_BYTES", 333)
+    monkeypatch.setattr(local_reader, "MAX_FILE_BYTES", len(text.encode("utf-8")) * 2)
+
+    docs = list(iter_documents(str(tmp_path), max_chars=200))
+    assert [d["id"] for d in docs] == ["big.md"]
+    assert not isinstance(docs[0]["chunks"], list)
+    assert list(docs[0]["chunks"]) == chunk_text(text, max_chars=200)
+
+
+def test_large_file_replaced_after_walk_is_skipped(tmp_path: Path, monkeypatch):
+    (tmp_path / "a.md").write_text("alpha " * 50, encoding="utf-8")
+    (tmp_path / "b.md").write_text("beta " * 50, encoding="utf-8")
+    monkeypatch.setattr(local_reader, "MMAP_THRESHOLD_BYTES", 1)
+    paths = list(local_reader.iter_local_files(str(tmp_path)))
+    # b.md is swapped for a directory between the walk and the read.
+    (tmp_path / "b.md").unlink()
+    (tmp_path / "b.md").mkdir()
+    monkeypatch.setattr(local_reader, "iter_local_files", lambda *args: iter(paths))
+
+    docs = list(iter_documents(str(tmp_path), workers=2))
+    assert [d["id"] for d in docs] == ["a.md"]
+    assert list(docs[0]["chunks"]) == chunk_text("alpha " * 50)
+
+
+def test_ingest_endpoint_reads_nested_folders(tmp_path: Path, monkeypatch):
+    pytest.importorskip("fastapi")
+    pytest.importorskip("chromadb")
+    from backend.app import main, rag
+    from tests.test_blue_green_ingest import _FakeClient
+
+    _tree(tmp_path / "docs")
+    client = _FakeClient()
+    monkeypatch.setattr(rag, "CHROMA_DIR", str(tmp_path / "chroma"))
+    monkeypatch.setattr(main, "get_client", lambda: client)
+
+    out = main.ingest(main.IngestRequest(path=str(tmp_path / "docs"), numpy_index=False))
+    assert out["status"] == "ok"
+    assert out["documents"] == 5
+    assert client.collections[out["active_collection"]].ids[:2] == ["top.md::chunk_0", "nested/bom.txt::chunk_0"]
+
+    out = main.ingest(main.IngestRequest(path=str(tmp_path / "docs"), include=["*.rst"], numpy_index=False))
+    assert out["status"] == "error"
+    assert "*.rst" in out["message"]
+
+
+def test_resolve_ingest_path_probes_with_request_globs(tmp_path: Path, monkeypatch):
+    pytest.importorskip("fastapi")
+    from backend.app import main
+
+    (tmp_path / "cwd" / "docs").mkdir(parents=True)
+    (tmp_path / "cwd" / "docs" / "readme.md").write_text("markdown", encoding="utf-8")
+    (tmp_path / "root" / "docs").mkdir(parents=True)
+    (tmp_path / "root" / "docs" / "guide.rst").write_text("restructured", encoding="utf-8")
+    monkeypatch.chdir(tmp_path / "cwd")
+    monkeypatch.setattr(main, "PROJECT_ROOT", str(tmp_path / "root"))
+    monkeypatch.setattr(main, "_resolved_ingest_paths", {})
+
+    assert main.resolve_ingest_path("docs") == "docs"
+    assert main.resolve_ingest_path("docs", include=["*.rst"]) == str(tmp_path / "root" / "docs")
+    assert main.resolve_ingest_path("docs") == "docs"
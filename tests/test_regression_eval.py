@@ -61,6 +61,23 @@ def test_run_regression_eval_writes_jsonl(tmp_path: Path):
     assert "latency_ms" in sample
 
 
+def test_failed_run_leaves_raw_artifact(tmp_path: Path):
+    def _flaky_query(question: str, top_k: int):
+        if "shipping" in question.lower():
+            raise RuntimeError("backend down")
+        return _stub_query(question, top_k)
+
+    dataset = [
+        {"id": "refund", "question": "What is the refund policy?"},
+        {"id": "shipping", "question": "What is the shipping timeline?"},
+    ]
+    with pytest.raises(RuntimeError):
+        run_regression_eval(_flaky_query, dataset, [{"name": "base"}], run_id="partial", artifact_dir=tmp_path)
+
+    lines = (tmp_path / "regression_partial.jsonl").read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line)["question_id"] for line in lines] == ["refund"]
+
+
 @pytest.mark.xfail(reason="TODO: detect hallucinations even when citations are present")
 def test_hallucination_with_citations_todo(tmp_path: Path):
     dataset = [{"id": "q1", "question": "What is the refund policy?"}]
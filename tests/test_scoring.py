@@ -0,0 +1,79 @@
+import math
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+pytest.importorskip("numpy")
+
+from backend.app.eval.regression import run_regression_eval
+from backend.app.eval.scoring import REFUSAL_PHRASES, grounding_scores, refusal_mask, score_records
+
+
+def test_refusal_matcher_matches_phrase_scan():
+    answers = [
+        "I couldn’t find an answer in the documents.",
+        "Sorry, I CANNOT help with that.",
+        "Refunds are available within 30 days.",
+        "",
+        "We are unable to ship internationally.",
+    ]
+    expected = [any(p in a.lower() for p in REFUSAL_PHRASES) for a in answers]
+    assert refusal_mask(answers).tolist() == expected
+
+
+def test_grounding_scores_token_overlap():
+    scores = grounding_scores(
+        [
+            "Refunds are issued within 30 days.",
+            "Refunds are issued within 30 days.",
+            "Unrelated made-up fact.",
+            "Anything at all.",
+        ],
+        [
+            "Refunds are issued to the original payment method within 30 days.",
+            "Refunds take ages.",
+            "Shipping takes 3-7 business days.",
+            "",
+        ],
+    )
+    assert scores[0] == pytest.approx(1.0)
+    # "refunds" out of {refunds, issued, within, 30, days}
+    assert scores[1] == pytest.approx(0.2)
+    assert scores[2] == pytest.approx(0.0)
+    assert math.isnan(scores[3])
+
+
+def test_score_records_flags_low_grounding_separately_from_hallucination():
+    scores = score_records(
+        ["Unrelated made-up fact.", "I could not find that.", "No docs answer."],
+        [[{"source": "a", "snippet": "Refund policy text."}], [], []],
+    )
+    assert scores["low_grounding"].tolist() == [True, False, False]
+    assert scores["hallucination"].tolist() == [False, False, True]
+    assert scores["refusal"].tolist() == [False, True, False]
+
+
+def test_regression_summary_reports_grounding(tmp_path: Path):
+    def _query(question: str, top_k: int):
+        snippet = "Customers can request a refund within 30 days of delivery."
+        return {
+            "answer": snippet if "refund" in question.lower() else "Orders ship on Mars.",
+            "citations": [{"source": "refund_policy.md", "snippet": snippet}],
+            "latency_ms": 5,
+        }
+
+    summary = run_regression_eval(
+        query_fn=_query,
+        dataset=[{"id": "r", "question": "Refund?"}, {"id": "s", "question": "Shipping?"}],
+        variants=[{"name": "base", "prompt_prefix": ""}],
+        run_id="grounding-run",
+        artifact_dir=tmp_path,
+    )
+
+    base = summary["variants"]["base"]
+    assert base["grounding_score_mean"] == pytest.approx(0.5)
+    assert base["low_grounding_rate"] == pytest.approx(0.5)
+    assert summary["overall"]["grounding_score_mean"] == pytest.approx(0.5)
@@ -0,0 +1,107 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+np = pytest.importorskip("numpy")
+
+from backend.app import vector_index
+from backend.app.vector_index import NumpyVectorIndex, build_index, build_index_from_batches
+
+
+def _corpus(n: int = 300, dim: int = 16):
+    rng = np.random.default_rng(7)
+    embeddings = rng.standard_normal((n, dim)).astype(np.float32)
+    ids = [f"nested/döc.md::chunk_{i}" for i in range(n)]
+    documents = [f"chunk text {i} – ünïcode" for i in range(n)]
+    metadatas = [{"source": f"docs/{i % 3}.md", "chunk": i} for i in range(n)]
+    return embeddings, ids, documents, metadatas
+
+
+@pytest.mark.parametrize("dtype", ["float16", "int8", "float32"])
+def test_search_returns_exact_neighbours(tmp_path: Path, monkeypatch, dtype: str):
+    # Force several blocks so the cross-block merge is exercised.
+    monkeypatch.setattr(vector_index, "BLOCK_ROWS", 64)
+    embeddings, ids, documents, metadatas = _corpus()
+    build_index(str(tmp_path / "idx"), embeddings, ids, documents, metadatas, dtype=dtype)
+    index = NumpyVectorIndex(str(tmp_path / "idx"))
+
+    queries = embeddings[[5, 150, 299]]
+    rows, scores = index.search(queries, top_k=4)
+
+    assert rows.shape == (3, 4)
+    assert rows[:, 0].tolist() == [5, 150, 299]
+    assert np.all(np.diff(scores, axis=1) <= 0)
+
+    normed = embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)
+    expected = np.argsort(-(normed[150] @ normed.T))[:4]
+    assert set(rows[1].tolist()) == set(expected.tolist())
+
+
+def test_records_round_trip(tmp_path: Path):
+    embeddings, ids, documents, metadatas = _corpus(n=5)
+    build_index(str(tmp_path / "idx"), embeddings, ids, documents, metadatas)
+    index = NumpyVectorIndex(str(tmp_path / "idx"))
+
+    assert len(index) == 5
+    assert index.document(3) == documents[3]
+    assert index.metadata(4) == {"source": "docs/1.md", "chunk": 4}
+    assert index.chunk_id(2) == ids[2]
+    assert index.search(embeddings[0], top_k=50)[0].shape == (1, 5)
+
+
+@pytest.mark.parametrize("dtype", ["float32", "int8"])
+def test_batched_build_matches_in_memory_build(tmp_path: Path, dtype: str):
+    embeddings, ids, documents, metadatas = _corpus(n=250)
+    build_index(str(tmp_path / "whole"), embeddings, ids, documents, metadatas, dtype=dtype)
+    batches = [
+        (embeddings[i : i + 64], ids[i : i + 64], documents[i : i + 64], metadatas[i : i + 64])
+        for i in range(0, 250, 64)
+    ]
+    build_index_from_batches(str(tmp_path / "paged"), batches, count=250, dtype=dtype)
+
+    whole = NumpyVectorIndex(str(tmp_path / "whole"))
+    paged = NumpyVectorIndex(str(tmp_path / "paged"))
+    assert np.array_equal(whole.vectors, paged.vectors)
+    assert [paged.document(i) for i in (0, 64, 249)] == [documents[i] for i in (0, 64, 249)]
+    assert paged.metadata(130) == metadatas[130]
+    assert paged.chunk_id(249) == ids[249]
+
+    with pytest.raises(ValueError):
+        build_index_from_batches(str(tmp_path / "short"), batches[:2], count=250, dtype=dtype)
+    assert not (tmp_path / "short").exists()
+
+
+def test_load_and_remove_index(tmp_path: Path):
+    embeddings, ids, documents, metadatas = _corpus(n=3)
+    root = str(tmp_path)
+    assert vector_index.load_index(root, "docs_gen1") is None
+
+    path = vector_index.index_path(root, "docs_gen1")
+    Path(path).parent.mkdir(parents=True)
+    build_index(path, embeddings, ids, documents, metadatas)
+    assert vector_index.load_index(root, "docs_gen1") is vector_index.load_index(root, "docs_gen1")
+
+    vector_index.remove_index(root, "docs_gen1")
+    assert vector_index.load_index(root, "docs_gen1") is None
+
+
+def test_load_evicts_indexes_removed_by_another_worker(tmp_path: Path, monkeypatch):
+    embeddings, ids, documents, metadatas = _corpus(n=3)
+    root = str(tmp_path)
+    Path(vector_index.index_path(root, "x")).parent.mkdir(parents=True)
+    for name in ("docs_gen1", "docs_gen2"):
+        build_index(vector_index.index_path(root, name), embeddings, ids, documents, metadatas)
+    monkeypatch.setattr(vector_index, "_open_indexes", {})
+    vector_index.load_index(root, "docs_gen1")
+
+    # The worker that promoted gen2 retires gen1 with its own, separate cache.
+    with monkeypatch.context() as other_worker:
+        other_worker.setattr(vector_index, "_open_indexes", {})
+        vector_index.remove_index(root, "docs_gen1")
+    assert "docs_gen1" in vector_index._open_indexes
+
+    assert vector_index.load_index(root, "docs_gen2") is not None
+    assert set(vector_index._open_indexes) == {"docs_gen2"}